@@ -0,0 +1,103 @@
+// Seeds the Firestore emulator with synthetic `userSearch` entries and times
+// the queries the Friends page issues (see src/services/userSearch.js).
+//
+// Usage (Node 20.19+):
+//   FIRESTORE_EMULATOR_HOST=localhost:8080 FIREBASE_PROJECT_ID=demo-social npm run bench:search -- 200000
+//
+// Pass 0 as the user count to time queries against an already seeded index.
+
+import { initializeApp } from 'firebase/app';
+import {
+    collection, connectFirestoreEmulator, doc, getDocs, getFirestore, limit, query, where, writeBatch,
+} from 'firebase/firestore';
+import { matchesSearch, normalizeSearchText, queryToken, searchIndexEntry } from '../src/services/searchTokens.js';
+
+// Firestore rejects batches with more than 500 writes.
+const BATCH_LIMIT = 500;
+// Keep in step with SEARCH_LIMIT in src/services/userSearch.js.
+const SEARCH_LIMIT = 20;
+const CONCURRENT_COMMITS = 8;
+const RUNS = 5;
+
+const SYLLABLES = ['al', 'ex', 'an', 'dr', 'ma', 'ri', 'jo', 'se', 'li', 'na', 'ko', 'ta', 'ze', 'mi', 'lu', 'ra'];
+const QUERIES = ['a', 'al', 'ale', 'alex', 'Álex', 'mari', 'ria', 'zeta', 'nomatch'];
+
+const emulatorHost = process.env.FIRESTORE_EMULATOR_HOST;
+const projectId = process.env.FIREBASE_PROJECT_ID || process.env.REACT_APP_FIREBASE_PROJECT_ID;
+const userCount = Number(process.argv[2] ?? 10000);
+
+if (!emulatorHost || !projectId) {
+    console.error('Set FIRESTORE_EMULATOR_HOST and FIREBASE_PROJECT_ID to run the benchmark.');
+    process.exit(1);
+}
+
+const db = getFirestore(initializeApp({ projectId }));
+const [host, port] = emulatorHost.split(':');
+connectFirestoreEmulator(db, host, Number(port));
+
+// Deterministic usernames such as "Malira_42", so runs are comparable.
+const username = (index) => {
+    let name = '';
+    let n = index;
+    do {
+        name += SYLLABLES[n % SYLLABLES.length];
+        n = Math.floor(n / SYLLABLES.length);
+    } while (n > 0);
+    return `${name[0].toUpperCase()}${name.slice(1)}_${index % 100}`;
+};
+
+const seed = async () => {
+    const started = performance.now();
+    let commits = [];
+    for (let start = 0; start < userCount; start += BATCH_LIMIT) {
+        const batch = writeBatch(db);
+        for (let index = start; index < Math.min(start + BATCH_LIMIT, userCount); index++) {
+            const uid = `bench-${index}`;
+            batch.set(doc(db, 'userSearch', uid), searchIndexEntry(uid, { username: username(index) }));
+        }
+        commits.push(batch.commit());
+        if (commits.length === CONCURRENT_COMMITS) {
+            await Promise.all(commits);
+            commits = [];
+        }
+    }
+    await Promise.all(commits);
+    console.log(`Seeded ${userCount} users in ${Math.round(performance.now() - started)} ms.`);
+};
+
+const search = async (searchQuery) => {
+    const normalized = normalizeSearchText(searchQuery);
+    const q = query(
+        collection(db, 'userSearch'),
+        where('search_tokens', 'array-contains', queryToken(normalized)),
+        limit(SEARCH_LIMIT),
+    );
+    const querySnapshot = await getDocs(q);
+    return querySnapshot.docs.map((entryDoc) => entryDoc.data()).filter((entry) => matchesSearch(entry, normalized));
+};
+
+const bench = async () => {
+    if (userCount > 0) await seed();
+
+    for (const searchQuery of QUERIES) {
+        const timings = [];
+        let results = [];
+        for (let run = 0; run < RUNS; run++) {
+            const started = performance.now();
+            results = await search(searchQuery);
+            timings.push(performance.now() - started);
+        }
+        timings.sort((a, b) => a - b);
+        console.log(
+            `${JSON.stringify(searchQuery).padEnd(10)} ${String(results.length).padStart(3)} results  `
+            + `median ${timings[Math.floor(RUNS / 2)].toFixed(1)} ms  max ${timings[RUNS - 1].toFixed(1)} ms`,
+        );
+    }
+};
+
+bench()
+    .then(() => process.exit(0))
+    .catch((error) => {
+        console.error('Benchmark failed:', error);
+        process.exit(1);
+    });
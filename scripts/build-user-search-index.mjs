@@ -0,0 +1,63 @@
+// Builds the `userSearch` index from `users`.
+//
+// Every user doc gets a `userSearch/{uid}` entry holding only the fields the
+// search UI shows plus its search tokens (see src/services/searchTokens.js).
+// Entries are overwritten, so the script can be re-run after changing how
+// tokens are generated.
+//
+// Usage (against the Firestore emulator, Node 20.19+):
+//   FIRESTORE_EMULATOR_HOST=localhost:8080 FIREBASE_PROJECT_ID=demo-social npm run build:search-index
+
+import { initializeApp } from 'firebase/app';
+import {
+    collection, connectFirestoreEmulator, doc, documentId, getDocs, getFirestore, limit, orderBy, query,
+    startAfter, writeBatch,
+} from 'firebase/firestore';
+import { searchIndexEntry } from '../src/services/searchTokens.js';
+
+// Firestore rejects batches with more than 500 writes.
+const BATCH_LIMIT = 500;
+
+const emulatorHost = process.env.FIRESTORE_EMULATOR_HOST;
+const projectId = process.env.FIREBASE_PROJECT_ID || process.env.REACT_APP_FIREBASE_PROJECT_ID;
+
+if (!emulatorHost || !projectId) {
+    console.error('Set FIRESTORE_EMULATOR_HOST and FIREBASE_PROJECT_ID to build the index.');
+    process.exit(1);
+}
+
+const db = getFirestore(initializeApp({ projectId }));
+const [host, port] = emulatorHost.split(':');
+connectFirestoreEmulator(db, host, Number(port));
+
+const build = async () => {
+    let cursor = null;
+    let indexed = 0;
+
+    for (;;) {
+        // One page per batch: each user produces exactly one index write.
+        const q = cursor
+            ? query(collection(db, 'users'), orderBy(documentId()), startAfter(cursor), limit(BATCH_LIMIT))
+            : query(collection(db, 'users'), orderBy(documentId()), limit(BATCH_LIMIT));
+        const querySnapshot = await getDocs(q);
+        if (querySnapshot.empty) break;
+
+        const batch = writeBatch(db);
+        querySnapshot.docs.forEach((userDoc) => {
+            batch.set(doc(db, 'userSearch', userDoc.id), searchIndexEntry(userDoc.id, userDoc.data()));
+        });
+        await batch.commit();
+
+        indexed += querySnapshot.size;
+        cursor = querySnapshot.docs[querySnapshot.docs.length - 1];
+    }
+
+    console.log(`Indexed ${indexed} users.`);
+};
+
+build()
+    .then(() => process.exit(0))
+    .catch((error) => {
+        console.error('Building the search index failed:', error);
+        process.exit(1);
+    });
@@ -0,0 +1,43 @@
+// Reports the gzipped size of every JavaScript chunk in build/ and fails when
+// one exceeds its budget in bundle-budget.json (kB, gzipped). Chunks are
+// matched by webpack chunk name, e.g. `home` for static/js/home.1a2b3c4d.chunk.js;
+// chunks without an entry use the `default` budget.
+//
+// Usage: npm run build && npm run check:bundle
+
+import { readFileSync, readdirSync, existsSync } from 'fs';
+import { join } from 'path';
+import { gzipSync } from 'zlib';
+
+const root = new URL('..', import.meta.url).pathname;
+const jsDir = join(root, 'build', 'static', 'js');
+const budget = JSON.parse(readFileSync(join(root, 'bundle-budget.json'), 'utf8'));
+
+if (!existsSync(jsDir)) {
+    console.error('No build found. Run `npm run build` first.');
+    process.exit(1);
+}
+
+const chunkName = (file) => file.replace(/\.[0-9a-f]{8}(\.chunk)?\.js$/, '');
+
+const rows = readdirSync(jsDir)
+    .filter((file) => file.endsWith('.js'))
+    .map((file) => {
+        const name = chunkName(file);
+        const size = gzipSync(readFileSync(join(jsDir, file))).length / 1024;
+        const limit = budget.chunks[name] ?? budget.default;
+        return { file, name, size, limit, over: size > limit };
+    })
+    .sort((a, b) => b.size - a.size);
+
+rows.forEach(({ file, size, limit, over }) => {
+    const status = over ? 'OVER' : 'ok';
+    console.log(`${status.padEnd(5)} ${size.toFixed(1).padStart(7)} kB / ${String(limit).padStart(4)} kB  ${file}`);
+});
+
+const failures = rows.filter((row) => row.over);
+if (failures.length > 0) {
+    console.error(`\n${failures.length} chunk(s) over budget.`);
+    process.exit(1);
+}
+console.log('\nAll chunks within budget.');
@@ -0,0 +1,133 @@
+// Moves likes and comments out of post documents.
+//
+// For every post that still has `likes` / `comments` arrays this writes
+// `posts/{id}/likes/{uid}`, one `posts/{id}/comments` doc per comment and the
+// totals into the "legacy" counter shard (LEGACY_SHARD in src/services/counters.js),
+// which clients never increment, so it can run while the app is live. It then removes
+// the arrays from the post. Posts without the arrays are skipped, so the
+// script can be re-run safely.
+//
+// Usage (against the Firestore emulator):
+//   FIRESTORE_EMULATOR_HOST=localhost:8080 FIREBASE_PROJECT_ID=demo-social npm run migrate:engagement
+
+import { initializeApp } from 'firebase/app';
+import {
+    Timestamp, collection, connectFirestoreEmulator, deleteField, doc, documentId, getDocs, getFirestore,
+    limit, orderBy, query, startAfter, writeBatch,
+} from 'firebase/firestore';
+
+// Firestore rejects batches with more than 500 writes.
+const BATCH_LIMIT = 500;
+const PAGE_SIZE = 100;
+// Must match LEGACY_SHARD in src/services/counters.js, which this script can't import.
+const LEGACY_SHARD = 'legacy';
+
+const emulatorHost = process.env.FIRESTORE_EMULATOR_HOST;
+const projectId = process.env.FIREBASE_PROJECT_ID || process.env.REACT_APP_FIREBASE_PROJECT_ID;
+
+if (!emulatorHost || !projectId) {
+    console.error('Set FIRESTORE_EMULATOR_HOST and FIREBASE_PROJECT_ID to run the migration.');
+    process.exit(1);
+}
+
+const db = getFirestore(initializeApp({ projectId }));
+const [host, port] = emulatorHost.split(':');
+connectFirestoreEmulator(db, host, Number(port));
+
+const toTimestamp = (value) => {
+    if (!value) return Timestamp.now();
+    if (value instanceof Timestamp) return value;
+    const date = new Date(value);
+    return Number.isNaN(date.getTime()) ? Timestamp.now() : Timestamp.fromDate(date);
+};
+
+// Collects writes and commits them in batches of at most BATCH_LIMIT.
+const createWriter = () => {
+    let batch = writeBatch(db);
+    let size = 0;
+    let commits = 0;
+
+    const flush = async () => {
+        if (size === 0) return;
+        await batch.commit();
+        commits += 1;
+        batch = writeBatch(db);
+        size = 0;
+    };
+
+    return {
+        async add(write) {
+            if (size === BATCH_LIMIT) await flush();
+            write(batch);
+            size += 1;
+        },
+        flush,
+        get commits() { return commits; },
+    };
+};
+
+// Returns the writes needed for one post, with the array removal last so an
+// interrupted run leaves the post eligible for the next one.
+const migrationWrites = (postDoc) => {
+    const { likes, comments } = postDoc.data();
+    const postRef = postDoc.ref;
+    const likeList = Array.isArray(likes) ? likes : [];
+    const commentList = Array.isArray(comments) ? comments : [];
+
+    return [
+        ...likeList.map((uid) => (batch) => batch.set(doc(postRef, 'likes', uid), { uid, created_at: Timestamp.now() })),
+        // Deterministic ids keep a re-run after a partial failure from duplicating comments.
+        ...commentList.map((comment, index) => (batch) => batch.set(doc(postRef, 'comments', `legacy-${index}`), {
+            ...comment,
+            created_at: toTimestamp(comment.created_at),
+        })),
+        (batch) => batch.set(doc(postRef, 'counters', LEGACY_SHARD), {
+            like_count: new Set(likeList).size,
+            comment_count: commentList.length,
+        }),
+        (batch) => batch.update(postRef, { likes: deleteField(), comments: deleteField() }),
+    ];
+};
+
+const migrate = async () => {
+    const writer = createWriter();
+    let cursor = null;
+    let migrated = 0;
+    let skipped = 0;
+
+    for (;;) {
+        const q = cursor
+            ? query(collection(db, 'posts'), orderBy(documentId()), startAfter(cursor), limit(PAGE_SIZE))
+            : query(collection(db, 'posts'), orderBy(documentId()), limit(PAGE_SIZE));
+        const querySnapshot = await getDocs(q);
+        if (querySnapshot.empty) break;
+
+        for (const postDoc of querySnapshot.docs) {
+            const data = postDoc.data();
+            if (!('likes' in data) && !('comments' in data)) {
+                skipped += 1;
+                continue;
+            }
+            const writes = migrationWrites(postDoc);
+            if (writes.length > BATCH_LIMIT) {
+                // Very popular posts span several batches; the array removal stays last.
+                console.warn(`Post ${postDoc.id} needs ${writes.length} writes and will span several batches`);
+            }
+            for (const write of writes) {
+                await writer.add(write);
+            }
+            migrated += 1;
+        }
+        cursor = querySnapshot.docs[querySnapshot.docs.length - 1];
+    }
+
+    await writer.flush();
+    console.log(`Migrated ${migrated} posts, skipped ${skipped}, in ${writer.commits} batch commits.`);
+};
+
+migrate()
+    .then(() => process.exit(0))
+    .catch((error) => {
+        console.error('Migration failed:', error);
+        process.exit(1);
+    });
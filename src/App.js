@@ -1,18 +1,17 @@
-import React, { useEffect } from 'react'
+import React, { Suspense, lazy, useEffect } from 'react'
 import { BrowserRouter as Router, Routes, Route, Navigate, useParams } from 'react-router-dom'
 import { Box, ChakraProvider, Flex, Spinner } from '@chakra-ui/react'
 import Header from './components/layout/Header'
 import Sidebar from './components/layout/Sidebar'
-import Home from './pages/Home'
 import theme from './styles/theme'
 import Footer from './components/layout/Footer'
-import LoginForm from './components/forms/LoginForm'
-import RegisterForm from './components/forms/RegisterForm'
-import Profile from './pages/Profile'
 import { useAuthStore } from './store/authStore'
-import Friends from './pages/Friends'
-import Messages from './pages/Messages'
-import Notifications from './pages/Notifications'
+import { Home, LoginForm, RegisterForm, Profile, Friends, Messages, Notifications, prefetchRoutesWhenIdle } from './routes'
+
+// Production builds drop the branch, so the overlay never reaches their bundles.
+const MetricsOverlay = process.env.NODE_ENV === 'development'
+  ? lazy(() => import(/* webpackChunkName: "metrics-overlay" */ './components/common/MetricsOverlay'))
+  : null
 
 const PrivateRoute = ({ children }) => {
   const { isAuthenticated, isLoading } = useAuthStore();
@@ -38,9 +37,15 @@ export default function App() {
     const { isAuthenticated, isLoading, checkAuth } = useAuthStore();
 
     useEffect(() => {
-        checkAuth() 
+        return checkAuth()
     }, [checkAuth]);
 
+    useEffect(() => {
+        if (isAuthenticated) {
+            prefetchRoutesWhenIdle()
+        }
+    }, [isAuthenticated]);
+
     if (isLoading) return <Spinner />;
 
     return (
@@ -51,49 +56,56 @@ export default function App() {
             <Flex flex="1" pt="60px">
               {isAuthenticated && <Sidebar />}
               <Box flex="1" ml={isAuthenticated ? { base: '60px', md: '200px' } : 0} p={4}>
-                <Routes>
-                  <Route path="/login" element={
-                    <PublicRoute>
-                      <LoginForm />
-                    </PublicRoute>
-                  } />
-                  <Route path="/register" element={
-                    <PublicRoute>
-                      <RegisterForm />
-                    </PublicRoute>
-                  } />
-                  <Route path="/" element={
-                    <PrivateRoute>
-                      <Home />
-                    </PrivateRoute>
-                  } />
-                  <Route path="/profile/:userId" element={
-                    <PrivateRoute>
-                      <ProfileWrapper />
-                    </PrivateRoute>
-                  } />
-                  <Route path="/friends" element={
-                    <PrivateRoute>
-                      <Friends />
-                    </PrivateRoute>
-                  } />
-                  <Route path="/messages" element={
-                    <PrivateRoute>
-                      <Messages />
-                    </PrivateRoute>
-                  } />
-                  <Route path="/notifications" element={
-                    <PrivateRoute>
-                      <Notifications />
-                    </PrivateRoute>
-                  } />
+                <Suspense fallback={<Spinner />}>
+                  <Routes>
+                    <Route path="/login" element={
+                      <PublicRoute>
+                        <LoginForm />
+                      </PublicRoute>
+                    } />
+                    <Route path="/register" element={
+                      <PublicRoute>
+                        <RegisterForm />
+                      </PublicRoute>
+                    } />
+                    <Route path="/" element={
+                      <PrivateRoute>
+                        <Home />
+                      </PrivateRoute>
+                    } />
+                    <Route path="/profile/:userId" element={
+                      <PrivateRoute>
+                        <ProfileWrapper />
+                      </PrivateRoute>
+                    } />
+                    <Route path="/friends" element={
+                      <PrivateRoute>
+                        <Friends />
+                      </PrivateRoute>
+                    } />
+                    <Route path="/messages" element={
+                      <PrivateRoute>
+                        <Messages />
+                      </PrivateRoute>
+                    } />
+                    <Route path="/notifications" element={
+                      <PrivateRoute>
+                        <Notifications />
+                      </PrivateRoute>
+                    } />
                   
-                  <Route path="*" element={<Navigate to="/" />} />
-                </Routes>
+                    <Route path="*" element={<Navigate to="/" />} />
+                  </Routes>
+                </Suspense>
               </Box>
             </Flex>
             <Footer />
           </Flex>
+          {MetricsOverlay && (
+            <Suspense fallback={null}>
+              <MetricsOverlay />
+            </Suspense>
+          )}
         </Router>
       </ChakraProvider>
     )
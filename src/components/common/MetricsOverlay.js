@@ -0,0 +1,118 @@
+import React, { useEffect, useState } from 'react'
+import { Box, Button, HStack, Table, Tbody, Td, Text, Th, Thead, Tr } from '@chakra-ui/react'
+import { getMetrics, resetMetrics } from '../../services/instrumentation'
+
+const REFRESH_INTERVAL = 1000
+
+const formatMs = (value) => (value == null ? '–' : `${value.toFixed(1)} ms`)
+const formatKb = (bytes) => `${(bytes / 1024).toFixed(1)} KB`
+
+const Section = ({ title, headings, rows }) => (
+    <Box mt={3}>
+        <Text fontWeight="bold" mb={1}>{title}</Text>
+        {rows.length === 0 ? (
+            <Text color="gray.400">Nothing recorded yet.</Text>
+        ) : (
+            <Table size="sm" variant="unstyled">
+                <Thead>
+                    <Tr>{headings.map((heading) => <Th key={heading} px={1} color="gray.400">{heading}</Th>)}</Tr>
+                </Thead>
+                <Tbody>
+                    {rows.map(({ key, cells, highlight }) => (
+                        <Tr key={key} color={highlight ? 'red.300' : undefined}>
+                            {cells.map((cell, index) => <Td key={index} px={1} py={0.5}>{cell}</Td>)}
+                        </Tr>
+                    ))}
+                </Tbody>
+            </Table>
+        )}
+    </Box>
+)
+
+// Development-only panel showing what the instrumentation service has recorded:
+// Firestore operations, live listeners (leaks in red), Web Vitals and Profiler commits.
+export default function MetricsOverlay() {
+    const [isOpen, setIsOpen] = useState(false)
+    const [metrics, setMetrics] = useState(getMetrics)
+
+    useEffect(() => {
+        if (!isOpen) return
+        setMetrics(getMetrics())
+        const timer = setInterval(() => setMetrics(getMetrics()), REFRESH_INTERVAL)
+        return () => clearInterval(timer)
+    }, [isOpen])
+
+    const liveListeners = metrics.listeners.reduce((total, listener) => total + listener.live, 0)
+
+    if (!isOpen) {
+        return (
+            <Button position="fixed" bottom={4} right={4} zIndex="tooltip" size="xs" onClick={() => setIsOpen(true)}>
+                Metrics
+            </Button>
+        )
+    }
+
+    return (
+        <Box
+            position="fixed" bottom={4} right={4} zIndex="tooltip" w="480px" maxH="70vh" overflowY="auto"
+            p={3} bg="gray.900" color="gray.100" fontSize="xs" borderRadius="md" boxShadow="lg"
+        >
+            <HStack justify="space-between">
+                <Text fontWeight="bold">Metrics · {liveListeners} live listeners</Text>
+                <HStack>
+                    <Button size="xs" onClick={() => { resetMetrics(); setMetrics(getMetrics()) }}>Reset</Button>
+                    <Button size="xs" onClick={() => setIsOpen(false)}>Close</Button>
+                </HStack>
+            </HStack>
+
+            <Section
+                title="Firestore"
+                headings={['Name', 'Calls', 'Avg', 'Max', 'Docs', 'Size', 'Cache']}
+                rows={[...metrics.operations]
+                    .sort((a, b) => b.totalDuration - a.totalDuration)
+                    .map((op) => ({
+                        key: op.name,
+                        highlight: op.errors > 0,
+                        cells: [
+                            `${op.type === 'write' ? '↑' : '↓'} ${op.name}`, op.count, formatMs(op.totalDuration / op.count),
+                            formatMs(op.maxDuration), op.docs, formatKb(op.bytes), op.fromCache,
+                        ],
+                    }))}
+            />
+
+            <Section
+                title="Listeners"
+                headings={['Name', 'Live', 'Opened', 'First', 'Snapshots', 'Docs', 'Size']}
+                rows={metrics.listeners.map((listener) => ({
+                    key: listener.name,
+                    highlight: listener.leaks > 0,
+                    cells: [
+                        listener.name, listener.live, listener.opened, formatMs(listener.firstSnapshot),
+                        listener.snapshots, listener.docs, formatKb(listener.bytes),
+                    ],
+                }))}
+            />
+
+            <Section
+                title="React commits"
+                headings={['Profiler', 'Commits', 'Avg', 'Max', 'Base']}
+                rows={metrics.renders.map((render) => ({
+                    key: render.name,
+                    cells: [
+                        render.name, render.commits, formatMs(render.totalDuration / render.commits),
+                        formatMs(render.maxDuration), formatMs(render.baseDuration),
+                    ],
+                }))}
+            />
+
+            <Section
+                title="Web Vitals"
+                headings={['Metric', 'Value']}
+                rows={Object.entries(metrics.vitals).map(([name, value]) => ({
+                    key: name,
+                    cells: [name, name === 'CLS' ? value.toFixed(3) : formatMs(value)],
+                }))}
+            />
+        </Box>
+    )
+}
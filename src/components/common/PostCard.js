@@ -1,22 +1,44 @@
-import React, { useState } from 'react'
+import React, { memo, useEffect, useState } from 'react'
 import { Box, HStack, Avatar, VStack, Text, IconButton, Image, Button, Textarea, useDisclosure, Modal, ModalOverlay, ModalContent, ModalHeader, ModalFooter, ModalBody, ModalCloseButton, Menu, MenuButton, MenuList, MenuItem, useToast, Collapse } from '@chakra-ui/react'
 import { usePostStore } from '../../store/postStore'
 import { useAuthStore } from '../../store/authStore'
 import { FaHeart, FaRegHeart, FaComment, FaShare, FaEllipsisV, FaEdit, FaTrash } from 'react-icons/fa'
 import { motion, AnimatePresence } from 'framer-motion'
 
-export default function PostCard({ post }) {
-    const { likePost, unlikePost, commentOnPost, deletePost, updatePost } = usePostStore()
-    const { user } = useAuthStore()
+function PostCard({ post }) {
+    // Select only what is used so a change to another post doesn't re-render this card.
+    const likePost = usePostStore((state) => state.likePost)
+    const unlikePost = usePostStore((state) => state.unlikePost)
+    const commentOnPost = usePostStore((state) => state.commentOnPost)
+    const deletePost = usePostStore((state) => state.deletePost)
+    const updatePost = usePostStore((state) => state.updatePost)
+    const fetchEngagement = usePostStore((state) => state.fetchEngagement)
+    const fetchComments = usePostStore((state) => state.fetchComments)
+    const engagement = usePostStore((state) => state.engagement[post.id])
+    const comments = usePostStore((state) => state.comments[post.id])
+    const user = useAuthStore((state) => state.user)
     const [comment, setComment] = useState('')
     const [isEditing, setIsEditing] = useState(false)
     const [editedCaption, setEditedCaption] = useState(post.caption)
     const [showAllComments, setShowAllComments] = useState(false)
     const { isOpen, onOpen, onClose } = useDisclosure()
     const toast = useToast()
+    const isLiked = engagement?.is_liked || false
+    const commentCount = engagement?.comment_count || 0
+
+    useEffect(() => {
+        fetchEngagement(post.id)
+    }, [fetchEngagement, post.id, user])
+
+    const toggleComments = () => {
+        if (!showAllComments && !comments) {
+            fetchComments(post.id)
+        }
+        setShowAllComments(!showAllComments)
+    }
 
     const handleLike = () => {
-        if (post.is_liked) {
+        if (isLiked) {
             unlikePost(post.id)
         } else {
             likePost(post.id)
@@ -97,33 +119,41 @@ export default function PostCard({ post }) {
                         <Text>{renderContent(post.caption || '')}</Text>
                     )}
                     {post.image && (
-                        <Image src={post.image} alt="Post Image" borderRadius="md" maxH="400px" objectFit="cover" />
+                        <Image
+                            src={post.image}
+                            fallbackSrc={post.image_thumbnail || undefined}
+                            alt="Post Image"
+                            borderRadius="md"
+                            maxH="400px"
+                            objectFit="cover"
+                            decoding="async"
+                        />
                     )}
                     <HStack spacing={4} width="100%" justify="space-between">
                         <AnimatePresence>
                             <motion.div
-                                key={post.is_liked}
+                                key={isLiked}
                                 initial={{ scale: 1 }}
                                 animate={{ scale: [1, 1.2, 1] }}
                                 transition={{ duration: 0.3 }}
                             >
                                 <IconButton
-                                    icon={post.is_liked ? <FaHeart /> : <FaRegHeart />}
+                                    icon={isLiked ? <FaHeart /> : <FaRegHeart />}
                                     onClick={handleLike}
                                     aria-label="Like"
-                                    colorScheme={post.is_liked ? "red" : "gray"}
+                                    colorScheme={isLiked ? "red" : "gray"}
                                     variant="ghost"
                                 />
                             </motion.div>
                         </AnimatePresence>
-                        <Text>{post.likes?.length || 0} likes</Text>
+                        <Text>{engagement?.like_count || 0} likes</Text>
                         <IconButton
                             icon={<FaComment />}
                             aria-label="Comment"
                             onClick={onOpen}
                             variant="ghost"
                         />
-                        <Text>{post.comments?.length || 0} comments</Text>
+                        <Text>{commentCount} comments</Text>
                         <IconButton
                             icon={<FaShare />}
                             aria-label="Share"
@@ -148,17 +178,22 @@ export default function PostCard({ post }) {
                     )}
                     <Collapse in={showAllComments} animateOpacity>
                         <VStack align="start" width="100%" mt={4}>
-                            {post.comments?.slice(0, showAllComments ? undefined : 3).map((comment, index) => (
-                                <Box key={index} p={2} bg="gray.100" borderRadius="md" width="100%">
+                            {comments?.items.map((comment) => (
+                                <Box key={comment.id} p={2} bg="gray.100" borderRadius="md" width="100%">
                                     <Text fontWeight="bold">{comment.user || 'Unknown User'}</Text>
                                     <Text>{renderContent(comment.content || '')}</Text>
                                 </Box>
                             ))}
+                            {comments?.hasMore && comments.items.length > 0 && (
+                                <Button variant="link" size="sm" isLoading={comments.isLoading} onClick={() => fetchComments(post.id)}>
+                                    Load more comments
+                                </Button>
+                            )}
                         </VStack>
                     </Collapse>
-                    {post.comments?.length > 1 && (
-                        <Button variant="link" onClick={() => setShowAllComments(!showAllComments)}>
-                            {showAllComments ? 'Hide comments' : 'View all comments'}
+                    {commentCount > 0 && (
+                        <Button variant="link" onClick={toggleComments}>
+                            {showAllComments ? 'Hide comments' : 'View comments'}
                         </Button>
                     )}
                 </VStack>
@@ -186,4 +221,6 @@ export default function PostCard({ post }) {
             </Modal>
         </Box>
     )
-}
\ No newline at end of file
+}
+
+export default memo(PostCard)
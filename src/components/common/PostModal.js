@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import {
   Modal,
   ModalOverlay,
@@ -25,17 +25,30 @@ import { usePostStore } from '../../store/postStore';
 const PostModal = ({ isOpen, onClose, post }) => {
   const [comment, setComment] = useState('');
   const { user } = useAuthStore();
-  const { likePost, unlikePost, addComment } = usePostStore();
+  const { likePost, unlikePost, commentOnPost, fetchEngagement, fetchComments } = usePostStore();
+  const engagement = usePostStore((state) => (post ? state.engagement[post.id] : undefined));
+  const comments = usePostStore((state) => (post ? state.comments[post.id] : undefined));
   const toast = useToast();
 
+  // Comments are loaded a page at a time, only once the modal is opened.
+  useEffect(() => {
+    if (!isOpen || !post) return;
+    fetchEngagement(post.id);
+    if (!comments) fetchComments(post.id);
+  }, [isOpen, post, comments, fetchEngagement, fetchComments]);
+
   if (!post) return null;
 
+  const isLiked = engagement?.is_liked || false;
+  const likeCount = engagement?.like_count || 0;
+  const commentCount = engagement?.comment_count || 0;
+
   const handleLike = async () => {
     try {
-      if (post.likes.includes(user.uid)) {
-        await unlikePost(post.id, user.uid);
+      if (isLiked) {
+        await unlikePost(post.id);
       } else {
-        await likePost(post.id, user.uid);
+        await likePost(post.id);
       }
     } catch (error) {
       toast({
@@ -51,7 +64,10 @@ const PostModal = ({ isOpen, onClose, post }) => {
   const handleComment = async () => {
     if (!comment.trim()) return;
     try {
-      await addComment(post.id, user.uid, comment);
+      await commentOnPost(post.id, {
+        content: comment,
+        user: user.uid,
+      });
       setComment('');
       toast({
         title: 'Comment added',
@@ -81,26 +97,31 @@ const PostModal = ({ isOpen, onClose, post }) => {
             <Image src={post.image} alt={post.caption} objectFit="cover" w="100%" maxH="400px" borderRadius="md" />
             <Text fontWeight="bold">{post.caption}</Text>
             <HStack justify="space-between">
-              <Button leftIcon={post.likes.includes(user.uid) ? <FaHeart color="red" /> : <FaRegHeart />} onClick={handleLike}>
-                {post.likes.length} {post.likes.length === 1 ? 'Like' : 'Likes'}
+              <Button leftIcon={isLiked ? <FaHeart color="red" /> : <FaRegHeart />} onClick={handleLike}>
+                {likeCount} {likeCount === 1 ? 'Like' : 'Likes'}
               </Button>
               <Button leftIcon={<FaComment />}>
-                {post.comments.length} {post.comments.length === 1 ? 'Comment' : 'Comments'}
+                {commentCount} {commentCount === 1 ? 'Comment' : 'Comments'}
               </Button>
             </HStack>
             <Divider />
             <VStack align="stretch" maxH="200px" overflowY="auto">
-              {post.comments.map((comment, index) => (
-                <Box key={index} p={2} borderWidth={1} borderRadius="md">
+              {comments?.items.map((comment) => (
+                <Box key={comment.id} p={2} borderWidth={1} borderRadius="md">
                   <HStack>
-                    <Avatar size="sm" name={comment.username} src={comment.userAvatar} />
+                    <Avatar size="sm" name={comment.user} />
                     <VStack align="start" spacing={0}>
-                      <Text fontWeight="bold">{comment.username}</Text>
-                      <Text>{comment.text}</Text>
+                      <Text fontWeight="bold">{comment.user}</Text>
+                      <Text>{comment.content}</Text>
                     </VStack>
                   </HStack>
                 </Box>
               ))}
+              {comments?.hasMore && comments.items.length > 0 && (
+                <Button variant="link" size="sm" isLoading={comments.isLoading} onClick={() => fetchComments(post.id)}>
+                  Load more comments
+                </Button>
+              )}
             </VStack>
           </VStack>
         </ModalBody>
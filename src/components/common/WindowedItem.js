@@ -0,0 +1,44 @@
+import React, { useEffect, useRef, useState } from 'react'
+import { Box } from '@chakra-ui/react'
+
+// How far outside the viewport an item stays mounted, so cards are ready before they scroll in.
+const OVERSCAN_MARGIN = '800px 0px'
+
+// Renders its children only while they are near the viewport. Off-screen items
+// collapse to an empty box of their last measured height so the scroll position holds.
+export default function WindowedItem({ children, estimatedHeight = 400 }) {
+    const ref = useRef(null)
+    const [isVisible, setIsVisible] = useState(true)
+    const [height, setHeight] = useState(estimatedHeight)
+
+    useEffect(() => {
+        const node = ref.current
+        if (!node || typeof IntersectionObserver === 'undefined') return
+
+        const observer = new IntersectionObserver(
+            ([entry]) => setIsVisible(entry.isIntersecting),
+            { rootMargin: OVERSCAN_MARGIN }
+        )
+        observer.observe(node)
+        return () => observer.disconnect()
+    }, [])
+
+    useEffect(() => {
+        const node = ref.current
+        if (!node || !isVisible || typeof ResizeObserver === 'undefined') return
+
+        const observer = new ResizeObserver(([entry]) => {
+            if (entry.contentRect.height > 0) {
+                setHeight(entry.contentRect.height)
+            }
+        })
+        observer.observe(node)
+        return () => observer.disconnect()
+    }, [isVisible])
+
+    return (
+        <Box ref={ref} minH={isVisible ? undefined : `${height}px`}>
+            {isVisible ? children : null}
+        </Box>
+    )
+}
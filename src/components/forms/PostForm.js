@@ -1,8 +1,9 @@
-import React, { useState, useRef } from 'react'
+import React, { useState, useRef, useEffect } from 'react'
 import { useForm } from 'react-hook-form'
 import { Box, Button, Textarea, useToast, VStack, Input, Image, IconButton, Flex, Text } from '@chakra-ui/react'
 import { usePostStore } from '../../store/postStore'
 import { Timestamp } from 'firebase/firestore'
+import { loadStorage } from '../../services/firebase'
 import { FaImage, FaTimes } from 'react-icons/fa'
 
 export default function PostForm() {
@@ -15,15 +16,20 @@ export default function PostForm() {
 
     const caption = watch('caption')
 
+    // Object URLs point at the file instead of copying it into a base64 string; release each one when replaced.
+    useEffect(() => {
+        return () => {
+            if (preview) URL.revokeObjectURL(preview)
+        }
+    }, [preview])
+
     const handleImageChange = (e) => {
         const file = e.target.files[0]
         if (file) {
             setImage(file)
-            const reader = new FileReader()
-            reader.onloadend = () => {
-                setPreview(reader.result)
-            }
-            reader.readAsDataURL(file)
+            setPreview(URL.createObjectURL(file))
+            // Warm up the upload code while the user writes the caption.
+            loadStorage().catch(() => {})
         }
     }
 
@@ -2,8 +2,11 @@ import React, { useState } from 'react';
 import { Link as RouterLink } from 'react-router-dom';
 import { Box, Button, FormControl, FormLabel, Input, VStack, Text, Link } from '@chakra-ui/react';
 import { useAuthStore } from '../../store/authStore';
-import { doc, setDoc } from 'firebase/firestore';
+import { doc } from 'firebase/firestore';
 import { auth, db } from '../../services/firebase';
+import { commitWrites } from '../../services/mutations';
+import { primeProfile } from '../../services/profileLoader';
+import { userSearchWrite } from '../../services/userSearch';
 
 export default function RegisterForm() {
   const [username, setUsername] = useState('');
@@ -18,15 +21,22 @@ export default function RegisterForm() {
     try {
       const user = await register(email, password);
       if (user) {
-        await setDoc(doc(db, 'users', auth.currentUser.uid), {
-          uid: auth.currentUser.uid,
+        const uid = auth.currentUser.uid;
+        const profile = {
+          uid,
           username: username,
           email: email, 
           profilePicture: null,
           bio: '',
           followers: [],
           following: [],
-        });
+        };
+        // The search index entry is written in the same batch so new users are findable right away.
+        await commitWrites([
+          (batch) => batch.set(doc(db, 'users', uid), profile),
+          userSearchWrite(uid, profile),
+        ], 'users.create');
+        primeProfile(uid, profile);
         console.log('user saved');
       }
     } catch (err) {
@@ -4,6 +4,7 @@ import React from 'react'
 import { FiBell, FiHome, FiLogOut, FiMessageSquare, FiSettings, FiUser, FiUsers } from 'react-icons/fi'
 import { Link, useLocation } from 'react-router-dom'
 import { useAuthStore } from '../../store/authStore'
+import { prefetchRoute } from '../../routes'
 
 const MotionBox = motion(Box)
 
@@ -28,6 +29,8 @@ const MenuItem = ({ icon, label, to }) => {
                 _hover={{ bg: hoverBg }}
                 whileHover={{ scale: 1.05 }}
                 whileTap={{ scale: 0.95 }}
+                onMouseEnter={to ? () => prefetchRoute(to) : undefined}
+                onFocus={to ? () => prefetchRoute(to) : undefined}
                 cursor="pointer"
             >
                 <Icon as={icon} boxSize={6} />
@@ -3,6 +3,7 @@ import ReactDOM from 'react-dom/client';
 import './index.css';
 import App from './App';
 import reportWebVitals from './reportWebVitals';
+import { reportWebVital } from './services/instrumentation';
 
 const root = ReactDOM.createRoot(document.getElementById('root'));
 root.render(
@@ -11,7 +12,7 @@ root.render(
   </React.StrictMode>
 );
 
-// If you want to start measuring performance in your app, pass a function
-// to log results (for example: reportWebVitals(console.log))
-// or send to an analytics endpoint. Learn more: https://bit.ly/CRA-vitals
-reportWebVitals();
+// Web Vitals go to the instrumentation service, which shows them in the
+// development metrics overlay and forwards them to any sink installed with
+// setMetricsSink (e.g. an analytics endpoint). Learn more: https://bit.ly/CRA-vitals
+reportWebVitals(reportWebVital);
@@ -1,4 +1,4 @@
-import React, { useEffect, useState, useCallback, useMemo } from 'react';
+import React, { useEffect, useState, useCallback, useMemo, useRef } from 'react';
 import { Box, VStack, HStack, Text, Avatar, Button, Input, InputGroup, InputLeftElement, Spinner, Tabs, TabList, Tab, TabPanels, TabPanel, useToast, Heading, useColorModeValue, Badge, IconButton, Tooltip, Flex, useBreakpointValue, Container, SimpleGrid } from '@chakra-ui/react';
 import { FaSearch, FaUserPlus, FaUserFriends, FaUserMinus, FaUserCheck, FaEnvelope } from 'react-icons/fa';
 import { useAuthStore } from '../store/authStore';
@@ -8,6 +8,7 @@ import { Link } from 'react-router-dom';
 import { useProfileStore } from '../store/userStore';
 
 const MotionBox = motion(Box);
+const SEARCH_DEBOUNCE = 250;
 
 const FriendItem = React.memo(({ friend, onRemoveFriend, bgColor, borderColor }) => (
     <MotionBox
@@ -63,6 +64,7 @@ const Friends = () => {
     const [searchQuery, setSearchQuery] = useState('');
     const [searchResults, setSearchResults] = useState([]);
     const [isSearching, setIsSearching] = useState(false);
+    const latestSearch = useRef(0);
     const [friendProfiles, setFriendProfiles] = useState([]);
     const toast = useToast();
     const bgColor = useColorModeValue('white', 'gray.800');
@@ -96,9 +98,12 @@ const Friends = () => {
 
     const handleSearch = useCallback(async () => {
         if (searchQuery.trim()) {
+            // Responses can arrive out of order while typing; only the latest search may update the results.
+            const searchId = ++latestSearch.current;
             setIsSearching(true);
             try {
                 const results = await searchUsers(searchQuery);
+                if (searchId !== latestSearch.current) return;
                 setSearchResults(results.filter(result => result.uid !== user.uid));
             } catch (error) {
                 toast({
@@ -109,11 +114,17 @@ const Friends = () => {
                     isClosable: true,
                 });
             } finally {
-                setIsSearching(false);
+                if (searchId === latestSearch.current) setIsSearching(false);
             }
         }
     }, [searchQuery, searchUsers, user, toast]);
 
+    // Search as the user types, once they pause for SEARCH_DEBOUNCE ms.
+    useEffect(() => {
+        const timer = setTimeout(handleSearch, SEARCH_DEBOUNCE);
+        return () => clearTimeout(timer);
+    }, [handleSearch]);
+
     const handleSendRequest = useCallback(async (friendId) => {
         if (!profile) {
             toast({
@@ -154,7 +165,6 @@ const Friends = () => {
                 duration: 3000,
                 isClosable: true,
             });
-            fetchFriendsData();
         } catch (error) {
             toast({
                 title: "Error accepting friend request",
@@ -164,7 +174,7 @@ const Friends = () => {
                 isClosable: true,
             });
         }
-    }, [user, acceptFriendRequest, toast, fetchFriendsData]);
+    }, [user, acceptFriendRequest, toast]);
 
     const handleRejectRequest = useCallback(async (friendId) => {
         try {
@@ -175,7 +185,6 @@ const Friends = () => {
                 duration: 3000,
                 isClosable: true,
             });
-            fetchFriendsData();
         } catch (error) {
             toast({
                 title: "Error rejecting friend request",
@@ -185,7 +194,7 @@ const Friends = () => {
                 isClosable: true,
             });
         }
-    }, [user, rejectFriendRequest, toast, fetchFriendsData]);
+    }, [user, rejectFriendRequest, toast]);
 
     const handleRemoveFriend = useCallback(async (friendId) => {
         try {
@@ -196,7 +205,6 @@ const Friends = () => {
                 duration: 3000,
                 isClosable: true,
             });
-            fetchFriendsData();
         } catch (error) {
             toast({
                 title: "Error removing friend",
@@ -206,7 +214,7 @@ const Friends = () => {
                 isClosable: true,
             });
         }
-    }, [user, removeFriend, toast, fetchFriendsData]);
+    }, [user, removeFriend, toast]);
 
     const friendsList = useMemo(() => (
         <SimpleGrid columns={{ base: 1, md: 2, lg: 3 }} spacing={4}>
@@ -341,7 +349,7 @@ const Friends = () => {
                                                                 <Avatar size="md" name={result.username} src={result.profilePicture} />
                                                                 <VStack align="start" spacing={0}>
                                                                     <Text fontWeight="bold">{result.username}</Text>
-                                                                    <Text fontSize="sm" color="gray.500">{result.email}</Text>
+                                                                    <Text fontSize="sm" color="gray.500">@{result.username}</Text>
                                                                 </VStack>
                                                             </HStack>
                                                             {friends.some(friend => friend.friendId === result.uid) ? (
@@ -1,32 +1,41 @@
-import React, { useEffect } from 'react'
+import React, { Profiler, useEffect } from 'react'
 import { Box, Heading, Text, VStack, Spinner, Container, Avatar, Flex, useColorModeValue } from '@chakra-ui/react'
 import PostForm from '../components/forms/PostForm'
 import PostCard from '../components/common/PostCard'
+import WindowedItem from '../components/common/WindowedItem'
+import InfiniteScroll from 'react-infinite-scroll-component'
 import { useAuthStore } from '../store/authStore'
 import { usePostStore } from '../store/postStore'
 import { useProfileStore } from '../store/userStore'
+import { recordRender } from '../services/instrumentation'
 
 export default function Home() {
-  const { posts, fetchPosts, isLoading: postsLoading } = usePostStore()
-  const { user } = useAuthStore()
-  const { profile, fetchProfile, isLoading: profileLoading } = useProfileStore()
+  // Individual selectors, so engagement, comment and profile-post updates don't re-render the whole feed.
+  const posts = usePostStore((state) => state.posts)
+  const hasMore = usePostStore((state) => state.hasMore)
+  const postsLoading = usePostStore((state) => state.isLoading)
+  const fetchPosts = usePostStore((state) => state.fetchPosts)
+  const fetchMorePosts = usePostStore((state) => state.fetchMorePosts)
+  const user = useAuthStore((state) => state.user)
+  const profile = useProfileStore((state) => state.ownProfile)
+  const fetchProfile = useProfileStore((state) => state.fetchProfile)
 
   const bgColor = useColorModeValue('gray.50', 'gray.900')
   const cardBgColor = useColorModeValue('white', 'gray.800')
 
+  // Both render from the persisted snapshot first; these calls reconcile it with the server.
+  // Until the profile arrives the header falls back to the account's email.
   useEffect(() => {
-    if (posts.length === 0) {
-      fetchPosts()
-    }
-  }, [fetchPosts, posts.length])
+    fetchPosts()
+  }, [fetchPosts])
 
   useEffect(() => {
-    if (user && !profile) {
+    if (user) {
       fetchProfile(user.uid)
     }
-  }, [user, profile, fetchProfile])
+  }, [user, fetchProfile])
 
-  if (postsLoading || profileLoading) return <Spinner size="xl" />
+  if (postsLoading) return <Spinner size="xl" />
 
   return (
     <Box bg={bgColor} minH="100vh" py={8}>
@@ -54,18 +63,29 @@ export default function Home() {
           <PostForm />
         </Box>
 
-        <VStack spacing={4} align="stretch">
-          {posts.map((post) => (
-            <PostCard key={post.id} post={post} bgColor={cardBgColor} />
-          ))}
-          {postsLoading && <Spinner />}
-          {!postsLoading && posts.length > 0 && (
-            <Text textAlign="center" mt={4}>No more posts to load.</Text>
-          )}
-          {!postsLoading && posts.length === 0 && (
-            <Text textAlign="center" mt={4}>No Posts Yet. Be the first to create one!</Text>
-          )}
-        </VStack>
+        <Profiler id="Feed" onRender={recordRender}>
+          <InfiniteScroll
+            dataLength={posts.length}
+            next={fetchMorePosts}
+            hasMore={hasMore}
+            loader={<Spinner display="block" mx="auto" mt={4} />}
+            endMessage={posts.length > 0 && (
+              <Text textAlign="center" mt={4}>No more posts to load.</Text>
+            )}
+            style={{ overflow: 'visible' }}
+          >
+            <VStack spacing={4} align="stretch">
+              {posts.map((post) => (
+                <WindowedItem key={post.id}>
+                  <PostCard post={post} bgColor={cardBgColor} />
+                </WindowedItem>
+              ))}
+            </VStack>
+          </InfiniteScroll>
+        </Profiler>
+        {!postsLoading && posts.length === 0 && (
+          <Text textAlign="center" mt={4}>No Posts Yet. Be the first to create one!</Text>
+        )}
       </Container>
     </Box>
   )
@@ -1,15 +1,22 @@
-import React, { useState, useEffect, useRef, useCallback, memo } from 'react';
+import React, { Profiler, useState, useEffect, useRef, useCallback, useMemo, memo } from 'react';
 import {
   Box, VStack, HStack, Text, Input, Avatar, Divider, useColorModeValue, Menu, MenuButton, MenuList, MenuItem,
   IconButton, Tooltip, useToast, Spinner, Badge, useBreakpointValue, Drawer, DrawerBody, DrawerHeader, DrawerOverlay, DrawerContent, DrawerCloseButton
 } from '@chakra-ui/react';
 import { FaPlus, FaFacebookMessenger, FaArrowLeft } from 'react-icons/fa';
-import { collection, query, where, orderBy, onSnapshot, addDoc, serverTimestamp, getDocs, updateDoc, doc, limit } from 'firebase/firestore';
+import { collection, query, where, orderBy, addDoc, serverTimestamp, getDocs, updateDoc, doc, limit } from 'firebase/firestore';
 import { db } from '../services/firebase';
+import { listen, measureRead, measureWrite, recordRender } from '../services/instrumentation';
+import { applyDocChanges, emptyCollection, toArray } from '../services/snapshotCollection';
 import { useAuthStore } from '../store/authStore';
 import { useFriendStore } from '../store/friendStore';
 import { useProfileStore } from '../store/userStore';
 
+const toItem = (doc) => ({
+  id: doc.id,
+  ...doc.data()
+});
+
 const MessageInput = memo(({ onSendMessage, isDisabled }) => {
   const [inputValue, setInputValue] = useState('');
   const inputRef = useRef(null);
@@ -57,12 +64,14 @@ const MessageInput = memo(({ onSendMessage, isDisabled }) => {
 
 export default function Messages() {
     const { user } = useAuthStore();
-    const { friends, fetchFriends, fetchFriendsProfile } = useFriendStore();
+    const { friends, fetchFriends, fetchFriendProfiles } = useFriendStore();
     const { profile } = useProfileStore();
     const [friendProfiles, setFriendProfiles] = useState({});
-    const [conversations, setConversations] = useState([]);
+    const [conversationIndex, setConversationIndex] = useState(emptyCollection);
     const [selectedConversation, setSelectedConversation] = useState(null);
-    const [messages, setMessages] = useState([]);
+    const [messageIndex, setMessageIndex] = useState(emptyCollection);
+    const conversations = useMemo(() => toArray(conversationIndex), [conversationIndex]);
+    const messages = useMemo(() => toArray(messageIndex), [messageIndex]);
     const [isLoading, setIsLoading] = useState(true);
     const messagesEndRef = useRef(null);
     const toast = useToast();
@@ -77,17 +86,17 @@ export default function Messages() {
 
     useEffect(() => {
         const fetchProfiles = async () => {
-            const profiles = {};
-            for (const friend of friends) {
-                const profile = await fetchFriendsProfile(friend.friendId);
-                profiles[friend.friendId] = profile;
+            try {
+                const profiles = await fetchFriendProfiles(friends.map(friend => friend.friendId));
+                setFriendProfiles(Object.fromEntries(profiles.map(profile => [profile.id, profile])));
+            } catch (error) {
+                console.error('Error fetching friend profiles:', error);
             }
-            setFriendProfiles(profiles);
         };
         if (friends.length > 0) {
             fetchProfiles();
         }
-    }, [friends, fetchFriendsProfile]);
+    }, [friends, fetchFriendProfiles]);
 
     const fetchConversations = useCallback(() => {
         setIsLoading(true);
@@ -99,12 +108,9 @@ export default function Messages() {
             limit(20)
         );
 
-        const unsubscribe = onSnapshot(q, (snapshot) => {
-            const conversationsData = snapshot.docs.map(doc => ({
-                id: doc.id,
-                ...doc.data()
-            }));
-            setConversations(conversationsData);
+        setConversationIndex(emptyCollection);
+        const unsubscribe = listen('messages.conversations', q, (snapshot) => {
+            setConversationIndex(index => applyDocChanges(index, snapshot, toItem));
             setIsLoading(false);
         });
 
@@ -114,7 +120,7 @@ export default function Messages() {
     useEffect(() => {
         if (user) {
             fetchFriends(user.uid);
-            fetchConversations();
+            return fetchConversations();
         }
     }, [user, fetchFriends, fetchConversations]);
 
@@ -130,12 +136,9 @@ export default function Messages() {
                 limit(50)
             );
 
-            const unsubscribe = onSnapshot(q, (snapshot) => {
-                const messagesData = snapshot.docs.map(doc => ({
-                    id: doc.id,
-                    ...doc.data()
-                }));
-                setMessages(messagesData);
+            setMessageIndex(emptyCollection);
+            const unsubscribe = listen('messages.thread', q, (snapshot) => {
+                setMessageIndex(index => applyDocChanges(index, snapshot, toItem));
                 setIsLoadingMessages(false);
                 scrollToBottom();
             });
@@ -155,17 +158,17 @@ export default function Messages() {
     const sendMessage = useCallback(async (message) => {
         if (message.trim() && selectedConversation) {
             try {
-                await addDoc(collection(db, 'messages'), {
+                await measureWrite('messages.send', addDoc(collection(db, 'messages'), {
                     conversationId: selectedConversation.id,
                     senderId: user.uid,
                     text: message,
                     timestamp: serverTimestamp()
-                });
+                }));
                 
-                await updateDoc(doc(db, 'conversations', selectedConversation.id), {
+                await measureWrite('messages.conversation.update', updateDoc(doc(db, 'conversations', selectedConversation.id), {
                     lastMessageTime: serverTimestamp(),
                     lastMessage: message
-                });
+                }));
             } catch (error) {
                 console.error('Error sending message:', error);
                 toast({
@@ -197,7 +200,7 @@ export default function Messages() {
                 conversationsRef,
                 where('participants', '==', participants)
             );
-            const querySnapshot = await getDocs(q);
+            const querySnapshot = await measureRead('messages.conversation.find', getDocs(q));
 
             if (querySnapshot.empty) {
                 const newConversationData = {
@@ -207,7 +210,7 @@ export default function Messages() {
                     lastMessage: ''
                 };
 
-                const newConversationRef = await addDoc(conversationsRef, newConversationData);
+                const newConversationRef = await measureWrite('messages.conversation.create', addDoc(conversationsRef, newConversationData));
                 setSelectedConversation({ id: newConversationRef.id, ...newConversationData });
             } else {
                 const existingConversation = querySnapshot.docs[0];
@@ -364,27 +367,29 @@ export default function Messages() {
     }, [selectedConversation, sendMessage]);
 
     return (
-        <Box h="calc(100vh - 60px)" bg={bgColor}>
-            {isMobile ? (
-                <>
-                    {!isDrawerOpen && <ConversationsList />}
-                    <Drawer isOpen={isDrawerOpen} placement="right" onClose={() => setIsDrawerOpen(false)} size="full">
-                        <DrawerOverlay />
-                        <DrawerContent>
-                            <DrawerCloseButton />
-                            <DrawerHeader>Chat</DrawerHeader>
-                            <DrawerBody p={0}>
-                                <ChatArea />
-                            </DrawerBody>
-                        </DrawerContent>
-                    </Drawer>
-                </>
-            ) : (
-                <HStack spacing={0} h="100%">
-                    <ConversationsList />
-                    <ChatArea />
-                </HStack>
-            )}
-        </Box>
+        <Profiler id="Messages" onRender={recordRender}>
+            <Box h="calc(100vh - 60px)" bg={bgColor}>
+                {isMobile ? (
+                    <>
+                        {!isDrawerOpen && <ConversationsList />}
+                        <Drawer isOpen={isDrawerOpen} placement="right" onClose={() => setIsDrawerOpen(false)} size="full">
+                            <DrawerOverlay />
+                            <DrawerContent>
+                                <DrawerCloseButton />
+                                <DrawerHeader>Chat</DrawerHeader>
+                                <DrawerBody p={0}>
+                                    <ChatArea />
+                                </DrawerBody>
+                            </DrawerContent>
+                        </Drawer>
+                    </>
+                ) : (
+                    <HStack spacing={0} h="100%">
+                        <ConversationsList />
+                        <ChatArea />
+                    </HStack>
+                )}
+            </Box>
+        </Profiler>
     );
 };
@@ -58,7 +58,7 @@ const NotificationItem = ({ notification, onAccept, onReject, onDelete }) => {
 
 export default function Notifications() {
   const { user } = useAuthStore();
-  const { notifications, fetchNotifications, deleteNotification, markAsRead, isLoading } = useNotificationStore();
+  const { notifications, fetchNotifications, deleteNotification, markAllAsRead, isLoading } = useNotificationStore();
   const { acceptFriendRequest, rejectFriendRequest } = useFriendStore();
   const [unreadCount, setUnreadCount] = useState(0);
 
@@ -89,7 +89,7 @@ export default function Notifications() {
   };
 
   const handleMarkAllAsRead = async () => {
-    await Promise.all(notifications.map(n => markAsRead(n.id)));
+    await markAllAsRead(user.uid);
   };
 
   if (isLoading) return <Spinner size="xl" />;
@@ -12,7 +12,9 @@ import PostModal from '../components/common/PostModal';
 export default function Profile() {
     const { userId } = useParams();
     const { profile, isLoading, error, fetchProfile, updateProfile } = useProfileStore();
-    const { posts, isLoading: postsLoading, error: postsError, fetchPosts } = usePostStore();
+    const userPosts = usePostStore((state) => state.userPosts[userId]);
+    const fetchUserPosts = usePostStore((state) => state.fetchUserPosts);
+    const fetchMoreUserPosts = usePostStore((state) => state.fetchMoreUserPosts);
     const { user, isLoading: authLoading } = useAuthStore();
     const { friends, sendFriendRequest, removeFriend, fetchFriends } = useFriendStore();
     const { isOpen: isEditModalOpen, onOpen: onEditModalOpen, onClose: onEditModalClose } = useDisclosure();
@@ -25,10 +27,10 @@ export default function Profile() {
     useEffect(() => {
         if (userId && userId !== 'undefined') {
             fetchProfile(userId);
-            fetchPosts(userId);
+            fetchUserPosts(userId);
             fetchFriends(userId);
         }
-    }, [userId, fetchProfile, fetchPosts, fetchFriends]);
+    }, [userId, fetchProfile, fetchUserPosts, fetchFriends]);
 
     const handleEditProfile = async (updatedProfile) => {
         try {
@@ -89,10 +91,11 @@ export default function Profile() {
         onPostModalOpen();
     };
 
+    const postsLoading = !userPosts || (userPosts.isLoading && userPosts.items.length === 0);
+
     if (isLoading || authLoading || postsLoading) return <Spinner size="xl" />
     if (error) return <Text>Error: {error.message || JSON.stringify(error)}</Text>
     if (!profile) return <Text>Profile not found</Text>
-    if (postsError) return <Text>Error: {postsError.message || JSON.stringify(postsError)}</Text>
 
     return (
         <Container maxW="container.xl" py={8}>
@@ -125,7 +128,7 @@ export default function Profile() {
                     <Flex justify="space-around" wrap="wrap">
                         <Stat textAlign="center">
                             <StatLabel>Posts</StatLabel>
-                            <StatNumber>{posts.filter(post => post.user === userId).length || 0}</StatNumber>
+                            <StatNumber>{userPosts.count}</StatNumber>
                         </Stat>
                         <Stat textAlign="center">
                             <StatLabel>Followers</StatLabel>
@@ -147,12 +150,17 @@ export default function Profile() {
                     <TabPanels>
                         <TabPanel>
                             <SimpleGrid columns={{ base: 1, sm: 2, md: 3 }} spacing={4}>
-                                {posts.filter(post => post.user === userId).map((post) => (
+                                {userPosts.items.map((post) => (
                                     <Box key={post.id} onClick={() => openPostModal(post)} cursor="pointer">
-                                        <Image src={post.image} alt={post.caption} objectFit="cover" w="100%" h="200px" borderRadius="md" />
+                                        <Image src={post.image_thumbnail || post.image} alt={post.caption} objectFit="cover" w="100%" h="200px" borderRadius="md" loading="lazy" />
                                     </Box>
                                 ))}
                             </SimpleGrid>
+                            {userPosts.hasMore && (
+                                <Button display="block" mx="auto" mt={4} onClick={() => fetchMoreUserPosts(userId)} isLoading={userPosts.isLoading}>
+                                    Load more
+                                </Button>
+                            )}
                         </TabPanel>
                         <TabPanel>
                             <SimpleGrid columns={{ base: 1, sm: 2, md: 3 }} spacing={4}>
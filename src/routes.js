@@ -0,0 +1,53 @@
+import { lazy } from 'react';
+
+// Each page is its own chunk. The importers are kept so a route can be fetched
+// ahead of navigation (on hover or when the browser is idle) and reused by React.lazy.
+const importers = {
+    '/': () => import(/* webpackChunkName: "home" */ './pages/Home'),
+    '/login': () => import(/* webpackChunkName: "login" */ './components/forms/LoginForm'),
+    '/register': () => import(/* webpackChunkName: "register" */ './components/forms/RegisterForm'),
+    '/profile': () => import(/* webpackChunkName: "profile" */ './pages/Profile'),
+    '/friends': () => import(/* webpackChunkName: "friends" */ './pages/Friends'),
+    '/messages': () => import(/* webpackChunkName: "messages" */ './pages/Messages'),
+    '/notifications': () => import(/* webpackChunkName: "notifications" */ './pages/Notifications'),
+};
+
+const loaded = {};
+
+const load = (path) => {
+    if (!loaded[path]) {
+        loaded[path] = importers[path]().catch((error) => {
+            // Let a later navigation retry, e.g. after a flaky network.
+            delete loaded[path];
+            throw error;
+        });
+    }
+    return loaded[path];
+};
+
+export const Home = lazy(() => load('/'));
+export const LoginForm = lazy(() => load('/login'));
+export const RegisterForm = lazy(() => load('/register'));
+export const Profile = lazy(() => load('/profile'));
+export const Friends = lazy(() => load('/friends'));
+export const Messages = lazy(() => load('/messages'));
+export const Notifications = lazy(() => load('/notifications'));
+
+// Starts downloading the chunk for `pathname`; matches `/profile/:userId` by its first segment.
+export const prefetchRoute = (pathname) => {
+    if (!pathname) return;
+    const path = pathname === '/' ? '/' : `/${pathname.split('/')[1]}`;
+    if (importers[path]) {
+        load(path).catch(() => {});
+    }
+};
+
+// Fetches the signed-in pages once the main thread is idle.
+export const prefetchRoutesWhenIdle = () => {
+    const prefetch = () => ['/', '/profile', '/friends', '/messages', '/notifications'].forEach(prefetchRoute);
+    if (typeof window.requestIdleCallback === 'function') {
+        window.requestIdleCallback(prefetch, { timeout: 5000 });
+    } else {
+        setTimeout(prefetch, 2000);
+    }
+};
@@ -0,0 +1,23 @@
+import { collection, doc, getAggregateFromServer, increment, sum } from 'firebase/firestore';
+import { measureRead } from './instrumentation';
+
+// Each counter is split across shard docs in `<parent>/counters` so concurrent
+// increments don't contend on a single document. Clients only pick the numbered
+// shards; scripts/migrate-post-engagement.mjs writes its totals into the
+// LEGACY_SHARD doc, so overwriting it never loses a client's increments.
+export const COUNTER_SHARDS = 10;
+export const LEGACY_SHARD = 'legacy';
+
+// Adds an increment of `field` on a random shard to `batch`, which may also be a transaction.
+export const incrementCounter = (batch, parentRef, field, delta = 1) => {
+    const shardRef = doc(parentRef, 'counters', String(Math.floor(Math.random() * COUNTER_SHARDS)));
+    batch.set(shardRef, { [field]: increment(delta) }, { merge: true });
+};
+
+// Sums `fields` across every shard in one aggregation query, billed as a single
+// read instead of one per shard. Resolves to an object of totals keyed by field name.
+export const readCounters = async (parentRef, fields) => {
+    const aggregate = Object.fromEntries(fields.map((field) => [field, sum(field)]));
+    const snapshot = await measureRead('counters', getAggregateFromServer(collection(parentRef, 'counters'), aggregate));
+    return snapshot.data();
+};
@@ -2,8 +2,9 @@
 import { initializeApp } from "firebase/app";
 // import { getAnalytics } from "firebase/analytics";
 import { getAuth } from "firebase/auth";
-import { getFirestore } from "firebase/firestore";
-import { getStorage } from 'firebase/storage';
+import {
+  clearIndexedDbPersistence, initializeFirestore, persistentLocalCache, persistentMultipleTabManager, terminate,
+} from "firebase/firestore";
 // TODO: Add SDKs for Firebase products that you want to use
 // https://firebase.google.com/docs/web/setup#available-libraries
 
@@ -23,7 +24,37 @@ const firebaseConfig = {
 const app = initializeApp(firebaseConfig);
 // const analytics = getAnalytics(app);
 const auth = getAuth(app);
-const db = getFirestore(app);
-const storage = getStorage(app);
+// Queries are answered from IndexedDB first and then kept in sync with the
+// server; the multi-tab manager lets every open tab share the same cache.
+const db = initializeFirestore(app, {
+  localCache: persistentLocalCache({ tabManager: persistentMultipleTabManager() }),
+});
 
-export { auth, db, storage };
+// Storage is only needed to upload post images, so its SDK is fetched on first use
+// rather than shipped with the startup bundle.
+let storagePromise = null;
+const loadStorage = () => {
+  if (!storagePromise) {
+    storagePromise = import(/* webpackChunkName: "firebase-storage" */ 'firebase/storage')
+      .then((storageModule) => ({ ...storageModule, storage: storageModule.getStorage(app) }))
+      .catch((error) => {
+        storagePromise = null;
+        throw error;
+      });
+  }
+  return storagePromise;
+};
+
+// Deletes the offline cache, e.g. after sign-out. `db` can't be used afterwards,
+// so the caller must reload the page. Other open tabs keep the cache in use, in
+// which case it is left in place.
+const clearFirestoreCache = async () => {
+  await terminate(db);
+  try {
+    await clearIndexedDbPersistence(db);
+  } catch (error) {
+    console.warn('Could not clear the Firestore cache:', error);
+  }
+};
+
+export { auth, db, loadStorage, clearFirestoreCache };
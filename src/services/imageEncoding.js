@@ -0,0 +1,58 @@
+// Resizes and re-encodes images for upload. Runs both inside the image worker
+// (with OffscreenCanvas) and on the main thread as a fallback.
+
+const MAX_DIMENSION = 1600;
+const THUMBNAIL_DIMENSION = 400;
+const QUALITY = 0.82;
+const THUMBNAIL_QUALITY = 0.7;
+
+const scaledSize = (width, height, maxDimension) => {
+    const scale = Math.min(1, maxDimension / Math.max(width, height));
+    return { width: Math.round(width * scale), height: Math.round(height * scale) };
+};
+
+const createCanvas = (width, height) => {
+    if (typeof OffscreenCanvas !== 'undefined') {
+        return new OffscreenCanvas(width, height);
+    }
+    const canvas = document.createElement('canvas');
+    canvas.width = width;
+    canvas.height = height;
+    return canvas;
+};
+
+const canvasToBlob = (canvas, type, quality) => {
+    if (canvas.convertToBlob) {
+        return canvas.convertToBlob({ type, quality });
+    }
+    return new Promise((resolve) => canvas.toBlob(resolve, type, quality));
+};
+
+const encode = async (bitmap, maxDimension, quality) => {
+    const { width, height } = scaledSize(bitmap.width, bitmap.height, maxDimension);
+    const canvas = createCanvas(width, height);
+    const context = canvas.getContext('2d');
+    context.imageSmoothingQuality = 'high';
+    context.drawImage(bitmap, 0, 0, width, height);
+
+    const webp = await canvasToBlob(canvas, 'image/webp', quality);
+    // Browsers without a WebP encoder silently return PNG, which is far larger for photos.
+    if (webp && webp.type === 'image/webp') return webp;
+    return canvasToBlob(canvas, 'image/jpeg', quality);
+};
+
+// Returns `{ image, thumbnail }` blobs: the image capped at MAX_DIMENSION on its
+// longest side and a THUMBNAIL_DIMENSION thumbnail. Animated GIFs keep their
+// original bytes, since re-encoding would drop every frame but the first.
+export const encodeImageVariants = async (file) => {
+    const bitmap = await createImageBitmap(file, { imageOrientation: 'from-image' });
+    try {
+        const [image, thumbnail] = await Promise.all([
+            file.type === 'image/gif' ? file : encode(bitmap, MAX_DIMENSION, QUALITY),
+            encode(bitmap, THUMBNAIL_DIMENSION, THUMBNAIL_QUALITY),
+        ]);
+        return { image, thumbnail };
+    } finally {
+        bitmap.close();
+    }
+};
@@ -0,0 +1,74 @@
+import { encodeImageVariants } from './imageEncoding';
+
+// A very large photo takes a few seconds; past this the original is uploaded instead.
+const ENCODE_TIMEOUT = 30 * 1000;
+
+let worker = null;
+let nextRequestId = 0;
+const requests = new Map();
+
+const supportsWorker = () =>
+    typeof Worker !== 'undefined' && typeof OffscreenCanvas !== 'undefined' && typeof createImageBitmap !== 'undefined';
+
+// A worker that failed to load or crashed never answers, so every pending
+// request is rejected and the next one starts a fresh worker.
+const failWorker = (error) => {
+    if (worker) {
+        worker.terminate();
+        worker = null;
+    }
+    requests.forEach((request) => request.reject(error));
+    requests.clear();
+};
+
+const getWorker = () => {
+    if (!worker) {
+        worker = new Worker(new URL('../workers/imageResize.worker.js', import.meta.url));
+        worker.onmessage = ({ data }) => {
+            const request = requests.get(data.id);
+            if (!request) return;
+            requests.delete(data.id);
+            if (data.error) {
+                request.reject(new Error(data.error));
+            } else {
+                request.resolve({ image: data.image, thumbnail: data.thumbnail });
+            }
+        };
+        worker.onerror = (event) => {
+            event.preventDefault();
+            failWorker(new Error(event.message || 'Image worker failed'));
+        };
+        worker.onmessageerror = () => failWorker(new Error('Image worker sent an unreadable message'));
+    }
+    return worker;
+};
+
+const encodeInWorker = (file) => new Promise((resolve, reject) => {
+    const id = nextRequestId++;
+    const timer = setTimeout(() => {
+        requests.delete(id);
+        reject(new Error('Image worker timed out'));
+    }, ENCODE_TIMEOUT);
+    requests.set(id, {
+        resolve: (result) => { clearTimeout(timer); resolve(result); },
+        reject: (error) => { clearTimeout(timer); reject(error); },
+    });
+    getWorker().postMessage({ id, file });
+});
+
+// Decodes, resizes and re-encodes an image file off the main thread when the
+// browser allows it. Resolves to `{ image, thumbnail }` blobs ready for upload;
+// if the browser can't decode the file, the original is uploaded without a thumbnail.
+export const prepareImageUpload = async (file) => {
+    try {
+        if (supportsWorker()) {
+            return await encodeInWorker(file);
+        }
+        if (typeof createImageBitmap !== 'undefined') {
+            return await encodeImageVariants(file);
+        }
+    } catch (error) {
+        console.error('Error resizing image, uploading original:', error);
+    }
+    return { image: file, thumbnail: null };
+};
@@ -0,0 +1,202 @@
+import { onSnapshot } from 'firebase/firestore';
+
+// Metrics for Firestore traffic, snapshot listeners, Web Vitals and React
+// commits. They are recorded in development (for MetricsOverlay) or once a sink
+// has been installed with setMetricsSink; otherwise every wrapper is a pass-through.
+
+const isDevelopment = process.env.NODE_ENV === 'development';
+// Live listeners under one name beyond this are reported as leaked.
+const DEFAULT_MAX_LIVE = 1;
+
+let sink = null;
+const operations = new Map();
+const listeners = new Map();
+const vitals = new Map();
+const renders = new Map();
+
+const isActive = () => isDevelopment || sink !== null;
+
+const now = () => performance.now();
+
+// Receives every metric as it is recorded, e.g. to batch them to an analytics
+// endpoint. Pass null to remove it.
+export const setMetricsSink = (nextSink) => {
+    sink = nextSink || null;
+};
+
+const emit = (metric) => {
+    if (!sink) return;
+    try {
+        sink({ ...metric, timestamp: Date.now() });
+    } catch (error) {
+        console.error('Metrics sink error:', error);
+    }
+};
+
+const snapshotDocs = (snapshot) => {
+    if (!snapshot) return [];
+    if (Array.isArray(snapshot.docs)) return snapshot.docs;
+    return typeof snapshot.exists === 'function' && snapshot.exists() ? [snapshot] : [];
+};
+
+// Firestore doesn't expose payload sizes; the JSON length of each document is a close enough proxy.
+const estimateBytes = (docs) =>
+    docs.reduce((total, snapshotDoc) => total + snapshotDoc.id.length + JSON.stringify(snapshotDoc.data()).length, 0);
+
+const recordOperation = (type, name, { duration, docs = 0, bytes = 0, fromCache = false, error = null }) => {
+    let stats = operations.get(name);
+    if (!stats) {
+        stats = { type, name, count: 0, errors: 0, totalDuration: 0, maxDuration: 0, docs: 0, bytes: 0, fromCache: 0 };
+        operations.set(name, stats);
+    }
+    stats.count += 1;
+    stats.totalDuration += duration;
+    stats.maxDuration = Math.max(stats.maxDuration, duration);
+    stats.docs += docs;
+    stats.bytes += bytes;
+    if (fromCache) stats.fromCache += 1;
+    if (error) stats.errors += 1;
+    emit({ type, name, duration, docs, bytes, fromCache, error: error ? error.message : null });
+};
+
+// Times a getDoc/getDocs promise and records the documents it resolved with.
+export const measureRead = async (name, read) => {
+    if (!isActive()) return read;
+    const started = now();
+    try {
+        const snapshot = await read;
+        const docs = snapshotDocs(snapshot);
+        recordOperation('read', name, {
+            duration: now() - started,
+            docs: docs.length,
+            bytes: estimateBytes(docs),
+            fromCache: Boolean(snapshot.metadata?.fromCache),
+        });
+        return snapshot;
+    } catch (error) {
+        recordOperation('read', name, { duration: now() - started, error });
+        throw error;
+    }
+};
+
+// Times a write promise that touches `docs` documents (more than one for batches).
+export const measureWrite = async (name, write, docs = 1) => {
+    if (!isActive()) return write;
+    const started = now();
+    try {
+        const result = await write;
+        recordOperation('write', name, { duration: now() - started, docs });
+        return result;
+    } catch (error) {
+        recordOperation('write', name, { duration: now() - started, docs, error });
+        throw error;
+    }
+};
+
+const listenerStats = (name) => {
+    let stats = listeners.get(name);
+    if (!stats) {
+        stats = { name, live: 0, opened: 0, leaks: 0, snapshots: 0, firstSnapshot: null, docs: 0, bytes: 0 };
+        listeners.set(name, stats);
+    }
+    return stats;
+};
+
+// Counts the listener behind `unsubscribe` as live under `name` until it is
+// called. More than `maxLive` live listeners under one name means an earlier
+// subscriber never unsubscribed, which is reported as a leak.
+export const trackSubscription = (name, unsubscribe, { maxLive = DEFAULT_MAX_LIVE } = {}) => {
+    if (!isActive()) return unsubscribe;
+    const stats = listenerStats(name);
+    stats.live += 1;
+    stats.opened += 1;
+    const leaked = stats.live > maxLive;
+    if (leaked) {
+        stats.leaks += 1;
+        if (isDevelopment) console.warn(`${stats.live} live "${name}" listeners (expected at most ${maxLive}); one was never unsubscribed.`);
+    }
+    emit({ type: 'listener', name, live: stats.live, leaked });
+
+    let closed = false;
+    return () => {
+        if (closed) return;
+        closed = true;
+        stats.live -= 1;
+        emit({ type: 'listener', name, live: stats.live, leaked: false });
+        unsubscribe();
+    };
+};
+
+// onSnapshot that records each snapshot's changed documents and the time to
+// the first snapshot, and tracks the listener with trackSubscription. Firestore
+// drops a listener after its error callback, so an error also stops tracking it.
+export const listen = (name, target, onNext, onError, options) => {
+    if (!isActive()) return onSnapshot(target, onNext, onError);
+    const stats = listenerStats(name);
+    const started = now();
+    let isFirst = true;
+
+    const handleNext = (snapshot) => {
+        const docs = typeof snapshot.docChanges === 'function'
+            ? snapshot.docChanges().filter((change) => change.type !== 'removed').map((change) => change.doc)
+            : snapshotDocs(snapshot);
+        const bytes = estimateBytes(docs);
+        const duration = isFirst ? now() - started : null;
+        if (isFirst) stats.firstSnapshot = duration;
+        isFirst = false;
+        stats.snapshots += 1;
+        stats.docs += docs.length;
+        stats.bytes += bytes;
+        emit({ type: 'snapshot', name, duration, docs: docs.length, bytes, fromCache: snapshot.metadata.fromCache });
+        onNext(snapshot);
+    };
+
+    let stop = null;
+    let failed = false;
+    const handleError = (error) => {
+        if (stop) stop();
+        else failed = true;
+        if (onError) onError(error);
+    };
+
+    stop = trackSubscription(name, onSnapshot(target, handleNext, handleError), options);
+    if (failed) stop();
+    return stop;
+};
+
+// Callback for reportWebVitals.
+export const reportWebVital = ({ name, value, delta, id }) => {
+    if (!isActive()) return;
+    vitals.set(name, value);
+    emit({ type: 'web-vital', name, value, delta, id });
+};
+
+// `onRender` callback for <Profiler>: records how long each commit of the profiled tree took.
+export const recordRender = (id, phase, actualDuration, baseDuration) => {
+    if (!isActive()) return;
+    let stats = renders.get(id);
+    if (!stats) {
+        stats = { name: id, commits: 0, totalDuration: 0, maxDuration: 0, baseDuration: 0 };
+        renders.set(id, stats);
+    }
+    stats.commits += 1;
+    stats.totalDuration += actualDuration;
+    stats.maxDuration = Math.max(stats.maxDuration, actualDuration);
+    stats.baseDuration = baseDuration;
+    emit({ type: 'render', name: id, phase, duration: actualDuration, baseDuration });
+};
+
+// Copies of the aggregates recorded so far, for MetricsOverlay or ad-hoc inspection.
+export const getMetrics = () => ({
+    operations: [...operations.values()].map((stats) => ({ ...stats })),
+    listeners: [...listeners.values()].map((stats) => ({ ...stats })),
+    vitals: Object.fromEntries(vitals),
+    renders: [...renders.values()].map((stats) => ({ ...stats })),
+});
+
+// Clears the operation and render aggregates. Listener counts are kept, since
+// the listeners they describe are still open.
+export const resetMetrics = () => {
+    operations.clear();
+    renders.clear();
+};
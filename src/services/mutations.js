@@ -0,0 +1,59 @@
+import { writeBatch } from 'firebase/firestore';
+import { db } from './firebase';
+import { measureWrite } from './instrumentation';
+
+// Firestore rejects batches with more than 500 writes.
+export const BATCH_LIMIT = 500;
+const COALESCE_DELAY = 400;
+
+const pending = new Map();
+
+// Applies `apply` to local state right away, then runs `commit`. If the commit
+// fails, `rollback` undoes the local change and the error is rethrown.
+export const optimisticMutation = async ({ apply, commit, rollback }) => {
+    apply();
+    try {
+        return await commit();
+    } catch (error) {
+        rollback(error);
+        throw error;
+    }
+};
+
+// Commits writes atomically per batch, chunked at BATCH_LIMIT. Each write is a
+// function that adds exactly one operation to the batch it is given, e.g.
+// `(batch) => batch.update(ref, data)`. Resolves once every chunk has committed.
+// `name` labels the commits in the instrumentation metrics.
+export const commitWrites = async (writes, name = 'batch') => {
+    const commits = [];
+    for (let i = 0; i < writes.length; i += BATCH_LIMIT) {
+        const batch = writeBatch(db);
+        const chunk = writes.slice(i, i + BATCH_LIMIT);
+        chunk.forEach((write) => write(batch));
+        commits.push(measureWrite(name, batch.commit(), chunk.length));
+    }
+    await Promise.all(commits);
+};
+
+// Collapses rapid changes to the same value (e.g. like/unlike spam) into one
+// commit. The caller applies each change locally; once `key` has been quiet
+// for `delay` ms, `commit(value)` runs with the latest value, unless it equals
+// `baseline`, the value before the first change. If the commit fails,
+// `rollback(baseline, error)` restores local state.
+export const coalesceMutation = (key, value, { baseline, commit, rollback, delay = COALESCE_DELAY }) => {
+    let entry = pending.get(key);
+    if (!entry) {
+        entry = { baseline, timer: null };
+        pending.set(key, entry);
+    }
+    entry.value = value;
+    clearTimeout(entry.timer);
+    entry.timer = setTimeout(() => {
+        pending.delete(key);
+        if (entry.value === entry.baseline) return;
+        commit(entry.value).catch((error) => {
+            console.error(`Error committing ${key}:`, error);
+            rollback(entry.baseline, error);
+        });
+    }, delay);
+};
@@ -0,0 +1,89 @@
+import { createJSONStorage } from 'zustand/middleware';
+import { Timestamp } from 'firebase/firestore';
+
+const KEY_PREFIX = 'social-network:';
+
+const signOutResets = [];
+
+// Bump when the shape of a persisted store changes; older snapshots are then
+// discarded instead of migrated, since the server is the source of truth.
+const STORAGE_VERSION = 1;
+
+// Timestamps and Dates become `{ __timestamp: millis }` so they come back as
+// Timestamps that still work as query cursors.
+function replacer(key, value) {
+    const original = this[key];
+    if (original instanceof Timestamp) return { __timestamp: original.toMillis() };
+    if (original instanceof Date) return { __timestamp: original.getTime() };
+    return value;
+}
+
+const reviver = (key, value) => (
+    value && typeof value === 'object' && '__timestamp' in value
+        ? Timestamp.fromMillis(value.__timestamp)
+        : value
+);
+
+// The snapshot is only a cache, so quota and private-mode errors are ignored.
+const safeLocalStorage = {
+    getItem: (name) => {
+        try {
+            return window.localStorage.getItem(name);
+        } catch (error) {
+            return null;
+        }
+    },
+    setItem: (name, value) => {
+        try {
+            window.localStorage.setItem(name, value);
+        } catch (error) {
+            console.warn(`Could not persist ${name}:`, error);
+        }
+    },
+    removeItem: (name) => {
+        try {
+            window.localStorage.removeItem(name);
+        } catch (error) {
+            // Nothing to clean up.
+        }
+    },
+};
+
+// Options for zustand's `persist` middleware. `partialize` picks the bounded
+// slice of state to save; `merge` rebuilds derived fields on hydration.
+export const persistOptions = (name, { partialize, merge }) => ({
+    name: `${KEY_PREFIX}${name}`,
+    version: STORAGE_VERSION,
+    storage: createJSONStorage(() => safeLocalStorage, { replacer, reviver }),
+    partialize,
+    merge: merge || ((persisted, current) => ({ ...current, ...persisted })),
+    migrate: () => ({}),
+});
+
+// Registers a persisted store to be returned to its initial state on sign-out.
+// `cleanup` runs first, e.g. to stop the store's listeners and clear module state.
+export const resetOnSignOut = (useStore, cleanup) => {
+    signOutResets.push(() => {
+        if (cleanup) cleanup();
+        useStore.setState(useStore.getInitialState(), true);
+    });
+};
+
+// Resets every registered store, then removes their snapshots so the next
+// user starts from nothing. Resetting first matters: a store's next `set()`
+// would otherwise write the previous user's data straight back.
+export const resetPersistedState = () => {
+    signOutResets.forEach((reset) => reset());
+    clearPersistedState();
+};
+
+// Removes every persisted store snapshot.
+export const clearPersistedState = () => {
+    try {
+        Object.keys(window.localStorage)
+            .filter((key) => key.startsWith(KEY_PREFIX))
+            .forEach((key) => window.localStorage.removeItem(key));
+    } catch (error) {
+        console.warn('Could not clear persisted state:', error);
+    }
+};
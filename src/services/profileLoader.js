@@ -0,0 +1,87 @@
+import { collection, documentId, getDocs, query, where } from 'firebase/firestore';
+import { db } from './firebase';
+import { measureRead } from './instrumentation';
+
+// Firestore accepts at most 30 values in an `in` filter.
+const BATCH_SIZE = 30;
+const CACHE_SIZE = 500;
+const CACHE_TTL = 5 * 60 * 1000;
+
+// Map iteration follows insertion order, so re-inserting on read keeps the
+// least recently used profile first in line for eviction.
+const cache = new Map();
+const inFlight = new Map();
+let pending = null;
+
+const readCache = (userId) => {
+    const entry = cache.get(userId);
+    if (!entry) return undefined;
+    cache.delete(userId);
+    if (entry.expiresAt <= Date.now()) return undefined;
+    cache.set(userId, entry);
+    return entry.profile;
+};
+
+const writeCache = (userId, profile) => {
+    cache.delete(userId);
+    cache.set(userId, { profile, expiresAt: Date.now() + CACHE_TTL });
+    while (cache.size > CACHE_SIZE) {
+        cache.delete(cache.keys().next().value);
+    }
+};
+
+const fetchBatch = async (userIds, requests) => {
+    try {
+        const q = query(collection(db, 'users'), where(documentId(), 'in', userIds));
+        const querySnapshot = await measureRead('users.profiles', getDocs(q));
+        const found = new Map(querySnapshot.docs.map((doc) => [doc.id, { id: doc.id, ...doc.data() }]));
+        userIds.forEach((userId) => {
+            const profile = found.get(userId) || null;
+            // Missing profiles are not cached: a new user's doc may be written moments later.
+            if (profile) writeCache(userId, profile);
+            requests.get(userId).resolve(profile);
+        });
+    } catch (error) {
+        userIds.forEach((userId) => requests.get(userId).reject(error));
+    } finally {
+        userIds.forEach((userId) => inFlight.delete(userId));
+    }
+};
+
+const flush = () => {
+    const requests = pending;
+    pending = null;
+    const userIds = [...requests.keys()];
+    for (let i = 0; i < userIds.length; i += BATCH_SIZE) {
+        fetchBatch(userIds.slice(i, i + BATCH_SIZE), requests);
+    }
+};
+
+// Resolves to `{ id, ...data }` or null when the user doc doesn't exist. Calls
+// made in the same tick are coalesced into chunked `documentId() in [...]` queries.
+export const loadProfile = (userId) => {
+    const cached = readCache(userId);
+    if (cached !== undefined) return Promise.resolve(cached);
+    if (inFlight.has(userId)) return inFlight.get(userId);
+
+    const promise = new Promise((resolve, reject) => {
+        if (!pending) {
+            pending = new Map();
+            Promise.resolve().then(flush);
+        }
+        pending.set(userId, { resolve, reject });
+    });
+    inFlight.set(userId, promise);
+    return promise;
+};
+
+export const loadProfiles = (userIds) => Promise.all(userIds.map(loadProfile));
+
+// Seeds the cache after a local write so readers don't refetch what we just saved.
+export const primeProfile = (userId, profile) => {
+    writeCache(userId, { id: userId, ...profile });
+};
+
+export const clearProfile = (userId) => {
+    cache.delete(userId);
+};
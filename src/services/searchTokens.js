@@ -0,0 +1,64 @@
+// Normalized search tokens for the `userSearch` index. Kept free of Firebase
+// imports so the backfill and benchmark scripts can share them with the app.
+
+// Longest prefix stored per word; longer query words are checked on the client.
+export const MAX_PREFIX_LENGTH = 15;
+const SEPARATORS = /[^\p{L}\p{N}]+/gu;
+
+// Lowercases and strips diacritics, so "Zoë" and "zoe" match.
+export const normalizeSearchText = (text) =>
+    (text || '')
+        .normalize('NFKD')
+        .replace(/[\u0300-\u036f]/g, '')
+        .toLowerCase()
+        .trim();
+
+const words = (normalized) => normalized.split(SEPARATORS).filter(Boolean);
+
+// Drops separators, so "johnsmith" finds "john_smith".
+const compact = (normalized) => normalized.replace(SEPARATORS, '');
+
+const addPrefixes = (tokens, text) => {
+    for (let length = 1; length <= Math.min(text.length, MAX_PREFIX_LENGTH); length++) {
+        tokens.add(text.slice(0, length));
+    }
+};
+
+// Every prefix (up to MAX_PREFIX_LENGTH) of every word and of the name without
+// separators, so a single `array-contains` on any query word finds its matches.
+export const searchTokens = (username) => {
+    const normalized = normalizeSearchText(username);
+    const tokens = new Set();
+    words(normalized).forEach((word) => addPrefixes(tokens, word));
+    addPrefixes(tokens, compact(normalized));
+    return [...tokens];
+};
+
+// The token sent to Firestore for a normalized query: its longest word, which
+// every match has as a token and which matches the fewest other names. Hits
+// are then checked with `matchesSearch` against the whole query.
+export const queryToken = (normalizedQuery) =>
+    words(normalizedQuery)
+        .reduce((longest, word) => (word.length > longest.length ? word : longest), '')
+        .slice(0, MAX_PREFIX_LENGTH);
+
+// Every query word must start a word of the name ("john smi" finds "John_Smith");
+// a single-word query may also start the name without separators.
+// A longer query never matches more names than a prefix of it, so a complete
+// cached result for the prefix can be narrowed instead of querying again.
+export const matchesSearch = (entry, normalizedQuery) => {
+    const queryWords = words(normalizedQuery);
+    if (queryWords.length === 0) return false;
+    const nameWords = words(entry.username_lower);
+    if (queryWords.every((part) => nameWords.some((word) => word.startsWith(part)))) return true;
+    return queryWords.length === 1 && compact(entry.username_lower).startsWith(queryWords[0]);
+};
+
+// The projected document stored at `userSearch/{uid}`: only what search results display.
+export const searchIndexEntry = (uid, profile) => ({
+    uid,
+    username: profile.username || '',
+    username_lower: normalizeSearchText(profile.username),
+    profilePicture: profile.profilePicture || profile.profile_picture || null,
+    search_tokens: searchTokens(profile.username),
+});
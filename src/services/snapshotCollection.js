@@ -0,0 +1,120 @@
+// Id-keyed collection state fed by Firestore snapshot listeners.
+//
+// A collection is `{ byId, ids }`: `byId` maps document ids to items and `ids`
+// holds their query order. Every helper returns a new collection but reuses the
+// objects of items that did not change, so memoized components that receive
+// them skip re-rendering, and `ids` keeps its identity unless the order changed.
+
+export const emptyCollection = Object.freeze({ byId: Object.freeze({}), ids: Object.freeze([]) });
+
+// Applies `snapshot.docChanges()` to a collection whose leading ids mirror the
+// snapshot's query. Items for added/modified documents are built with
+// `toItem(doc, previousItem)`. Removed documents are dropped unless
+// `retainRemoved(change)` returns true, in which case they are kept right after
+// the snapshot's documents (e.g. posts pushed out of a limited live page).
+export const applyDocChanges = (collection, snapshot, toItem, { retainRemoved } = {}) => {
+    const changes = snapshot.docChanges();
+    if (changes.length === 0) return collection;
+
+    const byId = { ...collection.byId };
+    const ids = collection.ids.slice();
+    const retained = [];
+    let orderChanged = false;
+
+    changes.forEach((change) => {
+        const id = change.doc.id;
+        if (change.type === 'removed') {
+            ids.splice(change.oldIndex, 1);
+            orderChanged = true;
+            if (retainRemoved && retainRemoved(change)) {
+                retained.push(id);
+            } else {
+                delete byId[id];
+            }
+            return;
+        }
+
+        byId[id] = toItem(change.doc, byId[id]);
+        if (change.type === 'added') {
+            // A document entering the query may already be listed after it (an
+            // older page or a retained item); move it instead of listing it twice.
+            const existing = ids.indexOf(id);
+            if (existing !== -1) ids.splice(existing, 1);
+            ids.splice(change.newIndex, 0, id);
+            orderChanged = true;
+        } else if (change.oldIndex !== change.newIndex) {
+            ids.splice(change.oldIndex, 1);
+            ids.splice(change.newIndex, 0, id);
+            orderChanged = true;
+        }
+    });
+
+    if (retained.length > 0) {
+        ids.splice(snapshot.size, 0, ...retained.filter((id) => !ids.includes(id)));
+    }
+
+    return { byId, ids: orderChanged ? ids : collection.ids };
+};
+
+// Appends items that are not already present, preserving their order.
+export const appendItems = (collection, items) => {
+    const fresh = items.filter((item) => !(item.id in collection.byId));
+    if (fresh.length === 0) return collection;
+
+    const byId = { ...collection.byId };
+    fresh.forEach((item) => { byId[item.id] = item; });
+    return { byId, ids: [...collection.ids, ...fresh.map((item) => item.id)] };
+};
+
+// Inserts an item at `index` (default: the end) unless it is already present.
+export const insertItem = (collection, item, index = collection.ids.length) => {
+    if (item.id in collection.byId) return collection;
+
+    const ids = collection.ids.slice();
+    ids.splice(index, 0, item.id);
+    return { byId: { ...collection.byId, [item.id]: item }, ids };
+};
+
+// Shallow-merges `patch` into a single item; other items keep their identity.
+export const patchItem = (collection, id, patch) => {
+    const item = collection.byId[id];
+    if (!item) return collection;
+
+    const next = typeof patch === 'function' ? patch(item) : { ...item, ...patch };
+    if (next === item) return collection;
+    return { byId: { ...collection.byId, [id]: next }, ids: collection.ids };
+};
+
+// Applies `update(item)` to every item in one pass; items it returns unchanged keep their identity.
+export const updateItems = (collection, update) => {
+    let byId = null;
+    collection.ids.forEach((id) => {
+        const item = collection.byId[id];
+        const next = update(item);
+        if (next !== item) {
+            byId = byId || { ...collection.byId };
+            byId[id] = next;
+        }
+    });
+    return byId ? { byId, ids: collection.ids } : collection;
+};
+
+export const removeItem = (collection, id) => {
+    if (!(id in collection.byId)) return collection;
+
+    const byId = { ...collection.byId };
+    delete byId[id];
+    return { byId, ids: collection.ids.filter((itemId) => itemId !== id) };
+};
+
+// Keeps only the first `count` items, e.g. to bound a persisted snapshot.
+export const takeItems = (collection, count) => {
+    if (collection.ids.length <= count) return collection;
+
+    const ids = collection.ids.slice(0, count);
+    const byId = {};
+    ids.forEach((id) => { byId[id] = collection.byId[id]; });
+    return { byId, ids };
+};
+
+export const toArray = (collection) => collection.ids.map((id) => collection.byId[id]);
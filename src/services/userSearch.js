@@ -0,0 +1,75 @@
+import { collection, doc, getDocs, limit, query, where } from 'firebase/firestore';
+import { db } from './firebase';
+import { measureRead } from './instrumentation';
+import { matchesSearch, normalizeSearchText, queryToken, searchIndexEntry } from './searchTokens';
+
+export const SEARCH_LIMIT = 20;
+const CACHE_SIZE = 100;
+const CACHE_TTL = 60 * 1000;
+
+// Normalized query -> { results, complete, expiresAt }. `complete` means the
+// query returned fewer than SEARCH_LIMIT hits, so every longer query that
+// starts with it can be answered by filtering these results locally.
+const cache = new Map();
+
+const readCache = (normalized) => {
+    const entry = cache.get(normalized);
+    if (!entry) return undefined;
+    cache.delete(normalized);
+    if (entry.expiresAt <= Date.now()) return undefined;
+    cache.set(normalized, entry);
+    return entry;
+};
+
+const writeCache = (normalized, results, complete) => {
+    cache.delete(normalized);
+    cache.set(normalized, { results, complete, expiresAt: Date.now() + CACHE_TTL });
+    while (cache.size > CACHE_SIZE) {
+        cache.delete(cache.keys().next().value);
+    }
+};
+
+// Finds the longest cached, complete prefix of `normalized` (e.g. "ale" for "alex").
+// A complete result holds every match of the prefix, which includes every
+// match of the longer query, whatever token either was fetched with.
+const cachedPrefixResults = (normalized) => {
+    for (let length = normalized.length - 1; length >= 1; length--) {
+        const entry = readCache(normalized.slice(0, length));
+        if (entry && entry.complete) return entry.results;
+    }
+    return undefined;
+};
+
+// Searches the projected `userSearch` index and resolves to at most
+// SEARCH_LIMIT `{ uid, username, profilePicture }` entries.
+export const searchUserIndex = async (searchQuery) => {
+    const normalized = normalizeSearchText(searchQuery);
+    const token = queryToken(normalized);
+    if (!token) return [];
+
+    const cached = readCache(normalized);
+    if (cached) return cached.results;
+
+    const prefixResults = cachedPrefixResults(normalized);
+    if (prefixResults) {
+        const results = prefixResults.filter((entry) => matchesSearch(entry, normalized));
+        writeCache(normalized, results, true);
+        return results;
+    }
+
+    const q = query(collection(db, 'userSearch'), where('search_tokens', 'array-contains', token), limit(SEARCH_LIMIT));
+    const querySnapshot = await measureRead('userSearch', getDocs(q));
+    const hits = querySnapshot.docs.map((entryDoc) => entryDoc.data());
+    const results = hits.filter((entry) => matchesSearch(entry, normalized));
+    // Longer queries filter the token's hits, so only a full page of hits can hide more matches.
+    writeCache(normalized, results, hits.length < SEARCH_LIMIT);
+    return results;
+};
+
+// A write for `commitWrites` that keeps `userSearch/{uid}` in step with a profile write.
+export const userSearchWrite = (uid, profile) => (batch) =>
+    batch.set(doc(db, 'userSearch', uid), searchIndexEntry(uid, profile), { merge: true });
+
+// Whether a profile update touches fields the search index projects.
+export const affectsSearchIndex = (data) =>
+    ['username', 'profilePicture', 'profile_picture'].some((field) => field in data);
@@ -1,8 +1,13 @@
 import { create } from 'zustand';
+import { persist } from 'zustand/middleware';
 import { createUserWithEmailAndPassword, onAuthStateChanged, signInWithEmailAndPassword, signOut } from 'firebase/auth';
-import { auth } from '../services/firebase';
+import { auth, clearFirestoreCache } from '../services/firebase';
+import { trackSubscription } from '../services/instrumentation';
+import { persistOptions, resetPersistedState } from '../services/persistence';
 
-export const useAuthStore = create((set) => ({
+let unsubscribeAuth = null;
+
+export const useAuthStore = create(persist((set) => ({
     user: null,
     isAuthenticated: false,
     isLoading: false,
@@ -34,7 +39,12 @@ export const useAuthStore = create((set) => ({
         set({ isLoading: true, error: null });
         try {
             await signOut(auth);
+            // Nothing of the previous user may survive into the next session:
+            // listeners, in-memory stores, their snapshots or the offline cache.
+            resetPersistedState();
             set({ user: null, isAuthenticated: false, isLoading: false, error: null });
+            await clearFirestoreCache();
+            window.location.assign('/login');
             return true;
         } catch (error) {
             console.log("Logout error:", error);
@@ -42,9 +52,30 @@ export const useAuthStore = create((set) => ({
             return false;
         }
     },
+    // Subscribes once, however often it is called; the returned function unsubscribes.
     checkAuth: () => {
-        onAuthStateChanged(auth, (user) => {
-            set({ user, isAuthenticated: !!user, isLoading: false }); // !!user converts user to boolean
-        });
+        if (!unsubscribeAuth) {
+            unsubscribeAuth = trackSubscription('auth.state', onAuthStateChanged(auth, (user) => {
+                set({ user, isAuthenticated: !!user, isLoading: false }); // !!user converts user to boolean
+            }));
+        }
+        return () => {
+            if (unsubscribeAuth) {
+                unsubscribeAuth();
+                unsubscribeAuth = null;
+            }
+        };
     },
-}));
\ No newline at end of file
+}), persistOptions('auth', {
+    // A plain copy of the signed-in user lets a warm start render private routes
+    // before onAuthStateChanged reports back; checkAuth then reconciles it.
+    partialize: (state) => ({
+        user: state.user && {
+            uid: state.user.uid,
+            email: state.user.email,
+            displayName: state.user.displayName,
+            photoURL: state.user.photoURL,
+        },
+        isAuthenticated: state.isAuthenticated,
+    }),
+})));
@@ -1,19 +1,48 @@
-import { addDoc, collection, deleteDoc, doc, getDoc, getDocs, query, where } from 'firebase/firestore';
+import { addDoc, collection, doc, getDocs, query, where } from 'firebase/firestore';
 import { create } from 'zustand';
+import { persist } from 'zustand/middleware';
 import { db } from '../services/firebase';
-
-export const useFriendStore = create((set, get) => ({
+import { measureRead, measureWrite } from '../services/instrumentation';
+import { commitWrites, optimisticMutation } from '../services/mutations';
+import { persistOptions, resetOnSignOut } from '../services/persistence';
+import { loadProfile, loadProfiles } from '../services/profileLoader';
+import { searchUserIndex } from '../services/userSearch';
+import { useAuthStore } from './authStore';
+
+const PERSISTED_FRIENDS = 500;
+
+const isRequestBetween = (request, from, to) => request.from === from && request.to === to;
+
+// Uses the requests already loaded into the store when possible and only queries when none match.
+// Puts back items an optimistic update removed, skipping any a listener or fetch has already restored.
+const restoreItems = (items, removed) => [
+    ...items,
+    ...removed.filter(item => !items.some(existing => existing.id === item.id))
+];
+
+const findRequestRefs = async (friendRequests, from, to) => {
+    const loaded = friendRequests.filter(request => isRequestBetween(request, from, to));
+    if (loaded.length > 0) {
+        return loaded.map(request => doc(db, 'friendRequests', request.id));
+    }
+    const q = query(collection(db, 'friendRequests'), where('from', '==', from), where('to', '==', to));
+    const querySnapshot = await measureRead('friendRequests.between', getDocs(q));
+    return querySnapshot.docs.map(requestDoc => requestDoc.ref);
+};
+
+export const useFriendStore = create(persist((set, get) => ({
     friends: [],
     friendRequests: [],
     isLoading: false,
     error: null,
 
     fetchFriends: async (userId) => {
-        set({isLoading: true});
+        // Friends restored from the last session stay on screen while they are refreshed.
+        set({isLoading: get().friends.length === 0});
         try {
             const friendsRef = collection(db, 'friends');
             const q = query(friendsRef, where('userId', '==', userId ));
-            const querySnapshot = await getDocs(q);
+            const querySnapshot = await measureRead('friends', getDocs(q));
             const friends = querySnapshot.docs.map((doc) => {
                 const friendData = {id: doc.id, ...doc.data()};
                 console.log('Friend:', friendData);
@@ -28,9 +57,9 @@ export const useFriendStore = create((set, get) => ({
 
     fetchFriendsProfile: async (friendId) => {
         try {
-            const userDoc = await getDoc(doc(db, 'users', friendId));
-            if (userDoc.exists()) {
-                return userDoc.data();
+            const profile = await loadProfile(friendId);
+            if (profile) {
+                return profile;
             } else {
                 console.error("Friend profile not found");
                 return null;
@@ -42,11 +71,11 @@ export const useFriendStore = create((set, get) => ({
     },
 
     fetchFriendRequests: async (userId) => {
-        set({isLoading: true});
+        set({isLoading: get().friends.length === 0 && get().friendRequests.length === 0});
         try {
             const requestsRef = collection(db, 'friendRequests');
             const q = query(requestsRef, where('to', '==', userId));
-            const querySnapshot = await getDocs(q);
+            const querySnapshot = await measureRead('friendRequests', getDocs(q));
             const friendRequests = querySnapshot.docs.map((doc) => ({id: doc.id, ...doc.data()}));
             set({friendRequests, isLoading: false});
         } catch (error) {
@@ -55,69 +84,64 @@ export const useFriendStore = create((set, get) => ({
         }
     },
 
+    // Case-insensitive prefix/infix search over the projected `userSearch` index.
     searchUsers: async (searchQuery) => {
-        set({isLoading: true});
         try {
-            const usersRef = collection(db, 'users');
-            const q = query(usersRef, where('username', '>=', searchQuery), where('username', '<=', searchQuery + '\uf8ff'));
-            const querySnapshot = await getDocs(q);
-            const users = querySnapshot.docs.map((doc) => ({id: doc.id, ...doc.data()}));
-            set({users, isLoading: false});
-            return users;
+            return await searchUserIndex(searchQuery);
         } catch (error) {
-            set({error: error.message, isLoading: false});
+            set({error: error.message});
             console.error(error);
             return [];
         }
     },
 
     sendFriendRequest: async (senderId, recipientId, recipientUsername) => {
-        set({isLoading: true});
         try {
-            await addDoc(collection(db, 'friendRequests'), {
+            await measureWrite('friendRequests.send', addDoc(collection(db, 'friendRequests'), {
                 from: senderId, 
                 to: recipientId, 
                 status: 'pending',
                 friendUsername: recipientUsername
-            });
-            set({isLoading: false});
+            }));
         } catch (error) {
-            set({error: error.message, isLoading: false});
+            set({error: error.message});
         }
     },
 
     acceptFriendRequest: async (userId, friendId) => {
-        set({isLoading: true});
+        const { friends, friendRequests } = get();
+        const acceptedRequests = friendRequests.filter(request => isRequestBetween(request, friendId, userId));
+        const userFriendRef = doc(collection(db, 'friends'));
+        const otherFriendRef = doc(collection(db, 'friends'));
         try {
-            // Add friend for current user
-            await addDoc(collection(db, 'friends'), { 
-                userId: userId,
-                friendId: friendId,
-            });
-
-            // Add friend for the other user
-            await addDoc(collection(db, 'friends'), { 
-                userId: friendId,
-                friendId: userId,
+            await optimisticMutation({
+                apply: () => set({
+                    friends: [...friends, {id: userFriendRef.id, userId, friendId}],
+                    friendRequests: friendRequests.filter(request => !isRequestBetween(request, friendId, userId))
+                }),
+                commit: async () => {
+                    const requestRefs = await findRequestRefs(friendRequests, friendId, userId);
+                    // Both friendship docs and the request deletions land together or not at all.
+                    await commitWrites([
+                        batch => batch.set(userFriendRef, {userId, friendId}),
+                        batch => batch.set(otherFriendRef, {userId: friendId, friendId: userId}),
+                        ...requestRefs.map(ref => batch => batch.delete(ref))
+                    ], 'friends.accept');
+                },
+                rollback: () => set(state => ({
+                    friends: state.friends.filter(friend => friend.id !== userFriendRef.id),
+                    friendRequests: restoreItems(state.friendRequests, acceptedRequests)
+                }))
             });
-
-            const friendRequestsRef = collection(db, 'friendRequests');
-            const q = query(friendRequestsRef, where('from', '==', friendId), where('to', '==', userId));
-            const querySnapshot = await getDocs(q);
-            querySnapshot.forEach(doc => 
-                deleteDoc(doc.ref)
-            );
-            get().fetchFriends(userId);
-            get().fetchFriendRequests(userId);
-            set({isLoading: false});
         } catch (error) {
-            set({error: error.message, isLoading: false});
+            set({error: error.message});
             console.error("Error accepting friend request", error);
         }
     },
 
     rejectFriendRequest: async (userId, friendId) => {
-        set({isLoading: true});
+        const { friendRequests } = get();
+        const rejectedRequests = friendRequests.filter(request => isRequestBetween(request, friendId, userId));
         try {
             if (!userId) {
                 throw new Error('userId is undefined');
@@ -127,86 +151,80 @@ export const useFriendStore = create((set, get) => ({
             }
 
             console.log(`Attempting to reject friend request from ${friendId} to ${userId}`);
-            
-            const friendRequestsRef = collection(db, 'friendRequests');
-            const q = query(friendRequestsRef, where('from', '==', friendId), where('to', '==', userId));
-            const querySnapshot = await getDocs(q);
-            
-            console.log(`Found ${querySnapshot.size} matching friend requests`);
-            
-            if (querySnapshot.empty) {
-                console.warn('No matching friend request found to reject');
-                set({isLoading: false});
-                return;
-            }
 
-            const deletePromises = querySnapshot.docs.map(doc => {
-                console.log(`Deleting friend request document with ID: ${doc.id}`);
-                return deleteDoc(doc.ref);
+            await optimisticMutation({
+                apply: () => set({
+                    friendRequests: friendRequests.filter(request => !isRequestBetween(request, friendId, userId))
+                }),
+                commit: async () => {
+                    const requestRefs = await findRequestRefs(friendRequests, friendId, userId);
+                    if (requestRefs.length === 0) {
+                        console.warn('No matching friend request found to reject');
+                        return;
+                    }
+                    await commitWrites(requestRefs.map(ref => batch => batch.delete(ref)), 'friendRequests.reject');
+                    console.log('Friend request(s) successfully rejected');
+                },
+                rollback: () => set(state => ({friendRequests: restoreItems(state.friendRequests, rejectedRequests)}))
             });
-
-            await Promise.all(deletePromises);
-
-            console.log('Friend request(s) successfully rejected');
-            
-            await get().fetchFriendRequests(userId);
-            set({isLoading: false});
         } catch (error) {
             console.error("Error rejecting friend request", error);
-            set({error: error.message, isLoading: false});
+            set({error: error.message});
         }
     },
 
     removeFriend: async (userId, friendId) => {
-        set({isLoading: true});
+        const { friends } = get();
+        const removedFriends = friends.filter(friend => friend.friendId === friendId);
         try {
             console.log('Removing friend. userId:', userId, 'friendId:', friendId);
             
             if (!userId || !friendId) {
                 throw new Error('Invalid userId or friendId');
             }
-    
-            const friendsRef = collection(db, 'friends');
-            const q1 = query(friendsRef, where('userId', '==', userId), where('friendId', '==', friendId));
-            const q2 = query(friendsRef, where('userId', '==', friendId), where('friendId', '==', userId));
-            
-            const [snapshot1, snapshot2] = await Promise.all([getDocs(q1), getDocs(q2)]);
-            
-            console.log('Found friend documents:', snapshot1.size + snapshot2.size);
-    
-            const deletePromises = [
-                ...snapshot1.docs.map(doc => deleteDoc(doc.ref)),
-                ...snapshot2.docs.map(doc => deleteDoc(doc.ref))
-            ];
-    
-            await Promise.all(deletePromises);
-    
-            console.log('Friend removed successfully');
-    
-            get().fetchFriends(userId);
-            set({isLoading: false});
+
+            await optimisticMutation({
+                apply: () => set({friends: friends.filter(friend => friend.friendId !== friendId)}),
+                commit: async () => {
+                    const friendsRef = collection(db, 'friends');
+                    const q1 = query(friendsRef, where('userId', '==', userId), where('friendId', '==', friendId));
+                    const q2 = query(friendsRef, where('userId', '==', friendId), where('friendId', '==', userId));
+                    const [snapshot1, snapshot2] = await Promise.all([
+                        measureRead('friends.between', getDocs(q1)),
+                        measureRead('friends.between', getDocs(q2))
+                    ]);
+                    console.log('Found friend documents:', snapshot1.size + snapshot2.size);
+
+                    await commitWrites([...snapshot1.docs, ...snapshot2.docs].map(friendDoc => batch => batch.delete(friendDoc.ref)), 'friends.remove');
+                    console.log('Friend removed successfully');
+                },
+                rollback: () => set(state => ({friends: restoreItems(state.friends, removedFriends)}))
+            });
         } catch (error) {
             console.error("Error removing friend", error);
-            set({error: error.message, isLoading: false});
+            set({error: error.message});
         }
     },
 
     fetchFriendProfiles: async (friendIds) => {
         try {
-            const friendProfiles = await Promise.all(
-                friendIds.map(async (friendId) => {
-                    const docRef = doc(db, 'users', friendId);
-                    const docSnap = await getDoc(docRef);
-                    if (docSnap.exists()) {
-                        return { id: docSnap.id, ...docSnap.data() };
-                    }
-                    return null;
-                })
-            );
+            const friendProfiles = await loadProfiles(friendIds);
             return friendProfiles.filter(profile => profile !== null);
         } catch (error) {
             console.error('Error fetching friend profiles:', error);
             throw error;
         }
     },
-}))
+}), persistOptions('friends', {
+    // Profile pages load other users' friends into the same list; only the signed-in user's are kept.
+    // The persisted auth user is used because Firebase Auth hasn't restored its session yet on a warm start.
+    partialize: (state) => {
+        const uid = useAuthStore.getState().user?.uid;
+        return {
+            friends: state.friends.filter(friend => friend.userId === uid).slice(0, PERSISTED_FRIENDS),
+            friendRequests: state.friendRequests.filter(request => request.to === uid).slice(0, PERSISTED_FRIENDS)
+        };
+    }
+})))
+
+resetOnSignOut(useFriendStore);
@@ -1,36 +1,81 @@
 import { create } from 'zustand';
-import { collection, query, where, getDocs, deleteDoc, doc, updateDoc, onSnapshot, addDoc } from 'firebase/firestore';
+import { persist } from 'zustand/middleware';
+import { collection, query, where, getDocs, deleteDoc, doc, updateDoc, setDoc } from 'firebase/firestore';
 import { db } from '../services/firebase';
+import { listen, measureRead, measureWrite } from '../services/instrumentation';
+import { commitWrites, optimisticMutation } from '../services/mutations';
+import { persistOptions, resetOnSignOut } from '../services/persistence';
+import { applyDocChanges, emptyCollection, insertItem, patchItem, removeItem, takeItems, toArray, updateItems } from '../services/snapshotCollection';
 
-export const useNotificationStore = create((set, get) => ({
+const PERSISTED_NOTIFICATIONS = 50;
+
+// One live listener, for the user it was opened for; the page remounting reuses it.
+let unsubscribeNotifications = null;
+let listeningUserId = null;
+
+const stopListening = () => {
+  if (unsubscribeNotifications) {
+    unsubscribeNotifications();
+    unsubscribeNotifications = null;
+    listeningUserId = null;
+  }
+};
+
+const toNotification = (doc) => ({
+  id: doc.id,
+  ...doc.data()
+});
+
+// `notifications` is derived from `notificationIndex` so existing readers keep working with an array.
+const withNotificationIndex = (notificationIndex) => ({
+  notificationIndex,
+  notifications: toArray(notificationIndex)
+});
+
+export const useNotificationStore = create(persist((set, get) => ({
+  notificationIndex: emptyCollection,
   notifications: [],
   isLoading: false,
   error: null,
 
   fetchNotifications: async (userId) => {
-    set({ isLoading: true });
+    if (unsubscribeNotifications && listeningUserId === userId) return unsubscribeNotifications;
+    stopListening();
+    // Notifications restored from the last session stay on screen until the first snapshot replaces them.
+    set({ isLoading: get().notifications.length === 0 });
     try {
       const q = query(collection(db, 'notifications'), where('recipientId', '==', userId));
-      const unsubscribe = onSnapshot(q, (querySnapshot) => {
-        const notificationsData = querySnapshot.docs.map(doc => ({
-          id: doc.id,
-          ...doc.data()
-        }));
-        set({ notifications: notificationsData, isLoading: false });
+      let isFirstSnapshot = true;
+      unsubscribeNotifications = listen('notifications', q, (querySnapshot) => {
+        const base = isFirstSnapshot ? emptyCollection : get().notificationIndex;
+        isFirstSnapshot = false;
+        set({
+          ...withNotificationIndex(applyDocChanges(base, querySnapshot, toNotification)),
+          isLoading: false
+        });
+      }, (error) => {
+        console.error('Error fetching notifications:', error);
+        stopListening();
+        set({ error: error.message, isLoading: false });
       });
-      return unsubscribe;
+      listeningUserId = userId;
+      return unsubscribeNotifications;
     } catch (error) {
       console.error('Error fetching notifications:', error);
       set({ error: error.message, isLoading: false });
     }
   },
 
+  stopNotificationsListener: stopListening,
+
   addNotification: async (notification) => {
+    const notificationRef = doc(collection(db, 'notifications'));
     try {
-      const docRef = await addDoc(collection(db, 'notifications'), notification);
-      set(state => ({
-        notifications: [...state.notifications, { id: docRef.id, ...notification }]
-      }));
+      await optimisticMutation({
+        apply: () => set(state => withNotificationIndex(insertItem(state.notificationIndex, { id: notificationRef.id, ...notification }))),
+        commit: () => measureWrite('notifications.add', setDoc(notificationRef, notification)),
+        rollback: () => set(state => withNotificationIndex(removeItem(state.notificationIndex, notificationRef.id))),
+      });
     } catch (error) {
       console.error('Error adding notification:', error);
       set({ error: error.message });
@@ -38,11 +83,15 @@ export const useNotificationStore = create((set, get) => ({
   },
 
   deleteNotification: async (notificationId) => {
+    const { notificationIndex } = get();
+    const previous = notificationIndex.byId[notificationId];
+    const position = notificationIndex.ids.indexOf(notificationId);
     try {
-      await deleteDoc(doc(db, 'notifications', notificationId));
-      set(state => ({
-        notifications: state.notifications.filter(n => n.id !== notificationId)
-      }));
+      await optimisticMutation({
+        apply: () => set(state => withNotificationIndex(removeItem(state.notificationIndex, notificationId))),
+        commit: () => measureWrite('notifications.delete', deleteDoc(doc(db, 'notifications', notificationId))),
+        rollback: () => previous && set(state => withNotificationIndex(insertItem(state.notificationIndex, previous, position))),
+      });
     } catch (error) {
       console.error('Error deleting notification:', error);
       set({ error: error.message });
@@ -50,13 +99,13 @@ export const useNotificationStore = create((set, get) => ({
   },
 
   markAsRead: async (notificationId) => {
+    const wasRead = get().notificationIndex.byId[notificationId]?.read || false;
     try {
-      await updateDoc(doc(db, 'notifications', notificationId), { read: true });
-      set(state => ({
-        notifications: state.notifications.map(n =>
-          n.id === notificationId ? { ...n, read: true } : n
-        )
-      }));
+      await optimisticMutation({
+        apply: () => set(state => withNotificationIndex(patchItem(state.notificationIndex, notificationId, { read: true }))),
+        commit: () => measureWrite('notifications.read', updateDoc(doc(db, 'notifications', notificationId), { read: true })),
+        rollback: () => set(state => withNotificationIndex(patchItem(state.notificationIndex, notificationId, { read: wasRead }))),
+      });
     } catch (error) {
       console.error('Error marking notification as read:', error);
       set({ error: error.message });
@@ -64,14 +113,23 @@ export const useNotificationStore = create((set, get) => ({
   },
 
   markAllAsRead: async (userId) => {
+    const { notificationIndex } = get();
+    const unreadIds = new Set(notificationIndex.ids.filter(id => !notificationIndex.byId[id].read));
     try {
-      const q = query(collection(db, 'notifications'), where('recipientId', '==', userId), where('read', '==', false));
-      const querySnapshot = await getDocs(q);
-      const updatePromises = querySnapshot.docs.map(doc => updateDoc(doc.ref, { read: true }));
-      await Promise.all(updatePromises);
-      set(state => ({
-        notifications: state.notifications.map(n => ({ ...n, read: true }))
-      }));
+      await optimisticMutation({
+        apply: () => set(state => withNotificationIndex(
+          updateItems(state.notificationIndex, n => (n.read ? n : { ...n, read: true }))
+        )),
+        commit: async () => {
+          // The query also catches unread notifications that aren't loaded locally.
+          const q = query(collection(db, 'notifications'), where('recipientId', '==', userId), where('read', '==', false));
+          const querySnapshot = await measureRead('notifications.unread', getDocs(q));
+          await commitWrites(querySnapshot.docs.map(notificationDoc => batch => batch.update(notificationDoc.ref, { read: true })), 'notifications.readAll');
+        },
+        rollback: () => set(state => withNotificationIndex(
+          updateItems(state.notificationIndex, n => (unreadIds.has(n.id) && n.read ? { ...n, read: false } : n))
+        )),
+      });
     } catch (error) {
       console.error('Error marking all notifications as read:', error);
       set({ error: error.message });
@@ -79,4 +137,12 @@ export const useNotificationStore = create((set, get) => ({
   },
 
   clearError: () => set({ error: null }),
-}));
\ No newline at end of file
+}), persistOptions('notifications', {
+  partialize: (state) => ({ notificationIndex: takeItems(state.notificationIndex, PERSISTED_NOTIFICATIONS) }),
+  merge: (persisted, current) => ({
+    ...current,
+    ...withNotificationIndex(persisted?.notificationIndex || current.notificationIndex),
+  }),
+})));
+
+resetOnSignOut(useNotificationStore, stopListening);
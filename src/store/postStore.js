@@ -1,54 +1,369 @@
 import { create } from 'zustand'
-import { auth, db, storage } from '../services/firebase';
-import { ref, uploadBytes, getDownloadURL } from 'firebase/storage';
-import { addDoc, arrayRemove, arrayUnion, collection, deleteDoc, doc, 
-    onSnapshot, orderBy, query, updateDoc } from 'firebase/firestore';
+import { persist } from 'zustand/middleware'
+import { auth, db, loadStorage } from '../services/firebase';
+import { addDoc, collection, collectionGroup, deleteDoc, doc, documentId, getCountFromServer, getDocs, limit,
+    orderBy, query, runTransaction, serverTimestamp, startAfter, updateDoc, where } from 'firebase/firestore';
+import { incrementCounter, readCounters } from '../services/counters';
+import { listen, measureRead, measureWrite } from '../services/instrumentation';
+import { coalesceMutation, commitWrites, optimisticMutation } from '../services/mutations';
+import { persistOptions, resetOnSignOut } from '../services/persistence';
+import { appendItems, applyDocChanges, emptyCollection, insertItem, patchItem, removeItem, takeItems, toArray }
+    from '../services/snapshotCollection';
 
-export const usePostStore = create((set, get) => ({
+export const FEED_PAGE_SIZE = 10;
+export const COMMENTS_PAGE_SIZE = 10;
+export const PROFILE_PAGE_SIZE = 12;
+
+// Firestore accepts at most 30 values in an `in` filter.
+const IN_FILTER_LIMIT = 30;
+// Counts older than this are refetched when a card shows them again.
+const ENGAGEMENT_TTL = 60 * 1000;
+
+// Only the newest page is kept live; older pages are fetched once with a cursor.
+let unsubscribeFeed = null;
+const pendingEngagement = new Set();
+// postId -> when its counts were loaded. Counts restored from the last session have no entry, so they are refreshed.
+const loadedEngagement = new Map();
+let queuedEngagement = null;
+
+const EMPTY_ENGAGEMENT = {like_count: 0, comment_count: 0, is_liked: false};
+const EMPTY_COMMENTS = {items: [], hasMore: true, isLoading: false};
+const EMPTY_USER_POSTS = {items: [], count: 0, hasMore: true, isLoading: false};
+
+const toMillis = (value) => {
+    if (!value) return 0;
+    if (typeof value.toMillis === 'function') return value.toMillis();
+    return new Date(value).getTime();
+};
+
+const uploadImage = async (path, blob) => {
+    const { storage, ref, uploadBytes, getDownloadURL } = await loadStorage();
+    const imageRef = ref(storage, path);
+    await uploadBytes(imageRef, blob, {contentType: blob.type, cacheControl: 'public, max-age=31536000'});
+    return getDownloadURL(imageRef);
+};
+
+// Likes and comments live in `posts/{id}/likes/{uid}` and `posts/{id}/comments`,
+// with totals in sharded counters, so post docs stay the same size however popular.
+const toPost = (doc) => ({
+    id: doc.id,
+    ...doc.data()
+});
+
+const toComment = (doc) => ({
+    id: doc.id,
+    ...doc.data()
+});
+
+const withEngagement = (state, postId, update) => ({
+    engagement: {...state.engagement, [postId]: update(state.engagement[postId] || EMPTY_ENGAGEMENT)}
+});
+
+// Finds which of `postIds` `uid` has liked, with one collection-group query per 30 posts.
+const readLikedPosts = async (postIds, uid) => {
+    const chunks = [];
+    for (let i = 0; i < postIds.length; i += IN_FILTER_LIMIT) {
+        const paths = postIds.slice(i, i + IN_FILTER_LIMIT).map((postId) => `posts/${postId}/likes/${uid}`);
+        chunks.push(measureRead('posts.like.status', getDocs(query(collectionGroup(db, 'likes'), where(documentId(), 'in', paths)))));
+    }
+    const snapshots = await Promise.all(chunks);
+    return new Set(snapshots.flatMap((querySnapshot) => querySnapshot.docs.map((likeDoc) => likeDoc.ref.parent.parent.id)));
+};
+
+const loadEngagement = async (set, postIds) => {
+    try {
+        const [counters, liked] = await Promise.all([
+            Promise.all(postIds.map((postId) => readCounters(doc(db, 'posts', postId), ['like_count', 'comment_count']))),
+            readLikedPosts(postIds, auth.currentUser.uid)
+        ]);
+        const loadedAt = Date.now();
+        set((state) => {
+            const engagement = {...state.engagement};
+            postIds.forEach((postId, index) => {
+                engagement[postId] = {
+                    like_count: counters[index].like_count || 0,
+                    comment_count: counters[index].comment_count || 0,
+                    is_liked: liked.has(postId)
+                };
+                loadedEngagement.set(postId, loadedAt);
+            });
+            return {engagement};
+        });
+    } catch (error) {
+        console.error('Error fetching post engagement:', error);
+    } finally {
+        postIds.forEach((postId) => pendingEngagement.delete(postId));
+    }
+};
+
+// Loads counts and like status for posts whose engagement is missing or older
+// than ENGAGEMENT_TTL, or for all of them with `force`. Calls made in the same
+// tick, e.g. a page of cards mounting, are loaded as one batch.
+const queueEngagement = (set, postIds, { force = false } = {}) => {
+    // On a warm start cards can mount before Firebase Auth has restored the session.
+    if (!auth.currentUser) return;
+    const now = Date.now();
+    const due = postIds.filter((postId) => !pendingEngagement.has(postId)
+        && (force || now - (loadedEngagement.get(postId) || 0) >= ENGAGEMENT_TTL));
+    if (due.length === 0) return;
+
+    due.forEach((postId) => pendingEngagement.add(postId));
+    if (!queuedEngagement) {
+        queuedEngagement = [];
+        Promise.resolve().then(() => {
+            const batch = queuedEngagement;
+            queuedEngagement = null;
+            loadEngagement(set, batch);
+        });
+    }
+    queuedEngagement.push(...due);
+};
+
+// Likes flip locally at once; rapid toggles on one post collapse into a single
+// commit of the final state, or none if it ends where it started. The commit
+// reads the like doc in a transaction and only writes, and moves the counter,
+// if it actually changes. Another tab, another device or a stale restored
+// `is_liked` therefore can't count a like twice or remove one that isn't there.
+const setLiked = (set, get, postId, liked) => {
+    const current = get().engagement[postId] || EMPTY_ENGAGEMENT;
+    if (current.is_liked === liked) return;
+
+    const showLiked = (value) => set((state) => withEngagement(state, postId, (engagement) => (
+        engagement.is_liked === value ? engagement : {
+            ...engagement,
+            is_liked: value,
+            like_count: Math.max(0, engagement.like_count + (value ? 1 : -1))
+        }
+    )));
+
+    showLiked(liked);
+    coalesceMutation(`like:${postId}`, liked, {
+        baseline: current.is_liked,
+        commit: async (value) => {
+            const postRef = doc(db, 'posts', postId);
+            const likeRef = doc(postRef, 'likes', auth.currentUser.uid);
+            const changed = await measureWrite('posts.like', runTransaction(db, async (transaction) => {
+                const like = await transaction.get(likeRef);
+                if (like.exists() === value) return false;
+                if (value) {
+                    transaction.set(likeRef, {uid: auth.currentUser.uid, created_at: serverTimestamp()});
+                } else {
+                    transaction.delete(likeRef);
+                }
+                incrementCounter(transaction, postRef, 'like_count', value ? 1 : -1);
+                return true;
+            }), 2);
+            if (!changed) {
+                // Local state was stale; reload the real count and like status.
+                queueEngagement(set, [postId], {force: true});
+            }
+        },
+        rollback: showLiked
+    });
+};
+
+const withComments = (state, postId, update) => ({
+    comments: {...state.comments, [postId]: update(state.comments[postId] || EMPTY_COMMENTS)}
+});
+
+// A profile's posts are queried per author; the feed only holds the newest posts from everyone.
+const withUserPosts = (state, userId, update) => ({
+    userPosts: {...state.userPosts, [userId]: update(state.userPosts[userId] || EMPTY_USER_POSTS)}
+});
+
+const withoutUserPost = (userPosts, postId) => {
+    const next = {};
+    Object.entries(userPosts).forEach(([userId, entry]) => {
+        next[userId] = entry.items.some((item) => item.id === postId)
+            ? {...entry, items: entry.items.filter((item) => item.id !== postId), count: Math.max(0, entry.count - 1)}
+            : entry;
+    });
+    return next;
+};
+
+// Where `postId` sits in each user's loaded profile posts, so a failed delete can put back just that post.
+const findUserPost = (userPosts, postId) => {
+    const found = {};
+    Object.entries(userPosts).forEach(([userId, entry]) => {
+        const position = entry.items.findIndex((item) => item.id === postId);
+        if (position !== -1) found[userId] = {item: entry.items[position], position};
+    });
+    return found;
+};
+
+const withUserPost = (userPosts, found) => {
+    const next = {...userPosts};
+    Object.entries(found).forEach(([userId, {item, position}]) => {
+        const entry = next[userId];
+        if (!entry || entry.items.some((existing) => existing.id === item.id)) return;
+        const items = entry.items.slice();
+        items.splice(Math.min(position, items.length), 0, item);
+        next[userId] = {...entry, items, count: entry.count + 1};
+    });
+    return next;
+};
+
+const userPostsQuery = (userId, cursor) => cursor
+    ? query(collection(db, 'posts'), where('user', '==', userId), orderBy('created_at', 'desc'), startAfter(cursor), limit(PROFILE_PAGE_SIZE))
+    : query(collection(db, 'posts'), where('user', '==', userId), orderBy('created_at', 'desc'), limit(PROFILE_PAGE_SIZE));
+
+// `posts` is derived from `postIndex` so existing readers keep working with an array.
+const withPostIndex = (postIndex) => ({postIndex, posts: toArray(postIndex)});
+
+export const usePostStore = create(persist((set, get) => ({
+    postIndex: emptyCollection,
     posts: [],
+    engagement: {},
+    comments: {},
+    userPosts: {},
+    hasMore: true,
     isLoading: false,
+    isFetchingMore: false,
     error: null,
 
     fetchPosts: async () => {
-        set({isLoading: true});
+        if (unsubscribeFeed) return unsubscribeFeed;
+        // Posts restored from the last session render right away; only an empty feed shows a spinner.
+        set({isLoading: get().posts.length === 0});
         try {
-            const q = query(collection(db, 'posts'), orderBy('created_at', 'desc'));
-            onSnapshot(q, (querySnapshot) => {
-                const posts = querySnapshot.docs.map((doc) => ({
-                    id: doc.id, 
-                    ...doc.data(), 
-                    is_liked: doc.data().likes?.includes(auth.currentUser.uid)
+            const q = query(collection(db, 'posts'), orderBy('created_at', 'desc'), limit(FEED_PAGE_SIZE));
+            let isFirstSnapshot = true;
+            unsubscribeFeed = listen('posts.feed', q, (querySnapshot) => {
+                const isFull = querySnapshot.size >= FEED_PAGE_SIZE;
+                const tail = toMillis(querySnapshot.docs[querySnapshot.size - 1]?.data().created_at);
+                // Posts pushed out of the live page by newer ones are kept ahead of
+                // the older pages; posts deleted from it are dropped.
+                const retainRemoved = (change) => isFull && toMillis(change.doc.data().created_at) <= tail;
+                // The first snapshot replaces the restored posts, dropping any deleted since.
+                const base = isFirstSnapshot ? emptyCollection : get().postIndex;
+                isFirstSnapshot = false;
+                set((state) => ({
+                    ...withPostIndex(applyDocChanges(base, querySnapshot, toPost, {retainRemoved})),
+                    hasMore: isFull && state.hasMore,
+                    isLoading: false
                 }));
-                set({posts, isLoading: false});
+                // Counts live outside the post docs, so every server snapshot refreshes them for the live page.
+                if (!querySnapshot.metadata.fromCache) {
+                    queueEngagement(set, querySnapshot.docs.map((postDoc) => postDoc.id), {force: true});
+                }
+            }, (error) => {
+                console.error('Error fetching posts:', error);
+                get().stopPostsListener();
+                set({error: error.message, isLoading: false});
             });
-
+            return unsubscribeFeed;
         } catch (error) {
             console.error('Error fetching posts:', error);
             set({error: error.message, isLoading: false});
         }
     },
 
+    fetchMorePosts: async () => {
+        const { posts, hasMore, isFetchingMore } = get();
+        if (!hasMore || isFetchingMore || posts.length === 0) return;
+        set({isFetchingMore: true});
+        try {
+            const cursor = posts[posts.length - 1].created_at;
+            const q = query(collection(db, 'posts'), orderBy('created_at', 'desc'), startAfter(cursor), limit(FEED_PAGE_SIZE));
+            const querySnapshot = await measureRead('posts.feed.page', getDocs(q));
+            const page = querySnapshot.docs.map(toPost);
+            set((state) => ({
+                ...withPostIndex(appendItems(state.postIndex, page)),
+                hasMore: querySnapshot.size >= FEED_PAGE_SIZE,
+                isFetchingMore: false
+            }));
+        } catch (error) {
+            console.error('Error fetching more posts:', error);
+            set({error: error.message, isFetchingMore: false});
+        }
+    },
+
+    stopPostsListener: () => {
+        if (unsubscribeFeed) {
+            unsubscribeFeed();
+            unsubscribeFeed = null;
+        }
+    },
+
+    // Loads the first page of a user's posts and their total count, replacing what was loaded before.
+    fetchUserPosts: async (userId) => {
+        set((state) => withUserPosts(state, userId, (userPosts) => ({...userPosts, isLoading: true})));
+        try {
+            const [querySnapshot, countSnapshot] = await Promise.all([
+                measureRead('posts.user', getDocs(userPostsQuery(userId))),
+                measureRead('posts.user.count', getCountFromServer(query(collection(db, 'posts'), where('user', '==', userId))))
+            ]);
+            set((state) => withUserPosts(state, userId, () => ({
+                items: querySnapshot.docs.map(toPost),
+                count: countSnapshot.data().count,
+                hasMore: querySnapshot.size >= PROFILE_PAGE_SIZE,
+                isLoading: false
+            })));
+        } catch (error) {
+            console.error('Error fetching user posts:', error);
+            set((state) => ({
+                ...withUserPosts(state, userId, (userPosts) => ({...userPosts, isLoading: false})),
+                error: error.message
+            }));
+        }
+    },
+
+    fetchMoreUserPosts: async (userId) => {
+        const current = get().userPosts[userId];
+        if (!current || !current.hasMore || current.isLoading || current.items.length === 0) return;
+        set((state) => withUserPosts(state, userId, (userPosts) => ({...userPosts, isLoading: true})));
+        try {
+            const cursor = current.items[current.items.length - 1].created_at;
+            const querySnapshot = await measureRead('posts.user', getDocs(userPostsQuery(userId, cursor)));
+            const page = querySnapshot.docs.map(toPost);
+            set((state) => withUserPosts(state, userId, (userPosts) => ({
+                ...userPosts,
+                items: [...userPosts.items, ...page.filter((post) => !userPosts.items.some((item) => item.id === post.id))],
+                hasMore: querySnapshot.size >= PROFILE_PAGE_SIZE,
+                isLoading: false
+            })));
+        } catch (error) {
+            console.error('Error fetching more user posts:', error);
+            set((state) => withUserPosts(state, userId, (userPosts) => ({...userPosts, isLoading: false})));
+        }
+    },
+
     createPost: async ({caption, image}) => {
         set({isLoading: true});
         try {
             let imageUrl = null;
+            let thumbnailUrl = null;
             if (image) {
-                const imageRef = ref(storage, `posts/${new Date().getTime()}`);
-                await uploadBytes(imageRef, image);
-                imageUrl = await getDownloadURL(imageRef);
+                const path = `posts/${new Date().getTime()}`;
+                const { prepareImageUpload } = await import(/* webpackChunkName: "image-pipeline" */ '../services/imagePipeline');
+                const { image: resized, thumbnail } = await prepareImageUpload(image);
+                [imageUrl, thumbnailUrl] = await Promise.all([
+                    uploadImage(path, resized),
+                    thumbnail ? uploadImage(`${path}_thumb`, thumbnail) : null,
+                ]);
             }
             
             const newPost = {
                 user: auth.currentUser.uid,
                 caption,
                 image: imageUrl,
+                image_thumbnail: thumbnailUrl,
                 created_at: new Date(),
-                likes: [],
-                comments: [],
             }
 
-            const docRef = await addDoc(collection(db, 'posts'), newPost);
-            set((state) => ({posts: [...state.posts, {...newPost, id: docRef.id}], isLoading: false}));
+            const docRef = await measureWrite('posts.create', addDoc(collection(db, 'posts'), newPost));
+            loadedEngagement.set(docRef.id, Date.now());
+            // The live newest-page listener usually delivers the post first.
+            set((state) => ({
+                ...withPostIndex(insertItem(state.postIndex, {...newPost, id: docRef.id}, 0)),
+                ...withEngagement(state, docRef.id, () => EMPTY_ENGAGEMENT),
+                ...(state.userPosts[newPost.user] && withUserPosts(state, newPost.user, (userPosts) => ({
+                    ...userPosts,
+                    items: [{...newPost, id: docRef.id}, ...userPosts.items],
+                    count: userPosts.count + 1
+                }))),
+                isLoading: false
+            }));
         } catch (error) {
             console.error('Error creating post:', error);
             set({error: error.message, isLoading: false});
@@ -56,46 +371,92 @@ export const usePostStore = create((set, get) => ({
     },
 
     updatePost: async (postId, updatedPost) => {
-        set({isLoading: true});
+        const previous = get().postIndex.byId[postId];
         try {
-            const postRef = doc(db, 'posts', postId);
-            await updateDoc(postRef, updatedPost);
-            set((state) => ({
-                posts: state.posts.map((post) => post.id === postId ? {...post, ...updatedPost} : post),
-                isLoading: false
-            }));
+            await optimisticMutation({
+                apply: () => set((state) => withPostIndex(patchItem(state.postIndex, postId, updatedPost))),
+                commit: () => measureWrite('posts.update', updateDoc(doc(db, 'posts', postId), updatedPost)),
+                rollback: () => set((state) => withPostIndex(patchItem(state.postIndex, postId, previous)))
+            });
         } catch (error) {
             console.error('Error updating post:', error);
-            set({error: error.message, isLoading: false});
+            set({error: error.message});
         }
     },
 
     deletePost: async (postId) => {
-        set({isLoading: true});
+        const { postIndex, userPosts } = get();
+        const previous = postIndex.byId[postId];
+        const position = postIndex.ids.indexOf(postId);
+        const previousUserPosts = findUserPost(userPosts, postId);
         try {
-            const postRef = doc(db, 'posts', postId);
-            await deleteDoc(postRef);
-            set((state) => ({
-                posts: state.posts.filter((post) => post.id !== postId),
-                isLoading: false
-            }));
+            await optimisticMutation({
+                apply: () => set((state) => ({
+                    ...withPostIndex(removeItem(state.postIndex, postId)),
+                    userPosts: withoutUserPost(state.userPosts, postId)
+                })),
+                commit: () => measureWrite('posts.delete', deleteDoc(doc(db, 'posts', postId))),
+                rollback: () => set((state) => ({
+                    ...(previous && withPostIndex(insertItem(state.postIndex, previous, position))),
+                    userPosts: withUserPost(state.userPosts, previousUserPosts)
+                }))
+            });
         } catch (error) {
             console.error('Error deleting post:', error);
-            set({error: error.message, isLoading: false});
+            set({error: error.message});
+        }
+    },
+
+    fetchEngagement: (postId) => {
+        queueEngagement(set, [postId]);
+    },
+
+    fetchComments: async (postId) => {
+        const current = get().comments[postId] || EMPTY_COMMENTS;
+        if (!current.hasMore || current.isLoading) return;
+        set((state) => withComments(state, postId, (comments) => ({...comments, isLoading: true})));
+        try {
+            const commentsRef = collection(db, 'posts', postId, 'comments');
+            const last = current.items[current.items.length - 1];
+            const q = last
+                ? query(commentsRef, orderBy('created_at', 'desc'), startAfter(last.created_at), limit(COMMENTS_PAGE_SIZE))
+                : query(commentsRef, orderBy('created_at', 'desc'), limit(COMMENTS_PAGE_SIZE));
+            const querySnapshot = await measureRead('posts.comments', getDocs(q));
+            const page = querySnapshot.docs.map(toComment);
+            set((state) => withComments(state, postId, (comments) => ({
+                items: [...comments.items, ...page.filter((comment) => !comments.items.some((item) => item.id === comment.id))],
+                hasMore: querySnapshot.size >= COMMENTS_PAGE_SIZE,
+                isLoading: false
+            })));
+        } catch (error) {
+            console.error('Error fetching comments:', error);
+            set((state) => withComments(state, postId, (comments) => ({...comments, isLoading: false})));
         }
     },
 
     commentOnPost: async (postId, comment) => {
         console.log('Commenting on post:', postId, comment)
+        const postRef = doc(db, 'posts', postId);
+        const commentRef = doc(collection(postRef, 'comments'));
+        const addLocally = (delta) => set((state) => ({
+            // Comments that haven't been opened yet will include this one when first fetched.
+            ...(state.comments[postId] && withComments(state, postId, (comments) => ({
+                ...comments,
+                items: delta > 0
+                    ? [{...comment, id: commentRef.id, created_at: new Date()}, ...comments.items]
+                    : comments.items.filter((item) => item.id !== commentRef.id)
+            }))),
+            ...withEngagement(state, postId, (engagement) => ({...engagement, comment_count: Math.max(0, engagement.comment_count + delta)}))
+        }));
         try {
-            const postRef = doc(db, 'posts', postId);
-            await updateDoc(postRef, {comments: arrayUnion(comment)});
-            set((state) => ({
-                posts: state.posts.map((post) => 
-                    post.id === postId ? {...post, comments: [...post.comments, comment]} : post
-                ),
-                isLoading: false
-            }));
+            await optimisticMutation({
+                apply: () => addLocally(1),
+                commit: () => commitWrites([
+                    (batch) => batch.set(commentRef, {...comment, created_at: serverTimestamp()}),
+                    (batch) => incrementCounter(batch, postRef, 'comment_count', 1)
+                ], 'posts.comment'),
+                rollback: () => addLocally(-1)
+            });
         } catch (error) {
             console.error('Error commenting on post:', error);
         }
@@ -103,33 +464,32 @@ export const usePostStore = create((set, get) => ({
 
     likePost: async (postId) => {
         console.log('Liking post:', postId)
-        try {
-            const postRef = doc(db, 'posts', postId);
-            await updateDoc(postRef, {likes: arrayUnion(auth.currentUser.uid)});
-            set((state) => ({
-                posts: state.posts.map((post) => 
-                    post.id === postId ? {...post, is_liked: true} : post
-                ),
-                isLoading: false
-            }));
-        } catch (error) {
-            console.error('Error liking post:', error);
-        }
+        setLiked(set, get, postId, true);
     },
 
     unlikePost: async (postId) => {
         console.log('Unliking post:', postId)
-        try {
-            const postRef = doc(db, 'posts', postId);
-            await updateDoc(postRef, {likes: arrayRemove(auth.currentUser.uid)});
-            set((state) => ({
-                posts: state.posts.map((post) => 
-                    post.id === postId ? {...post, is_liked: false} : post
-                ),
-                isLoading: false
-            }));
-        } catch (error) {
-            console.error('Error unliking post:', error);
-        }
+        setLiked(set, get, postId, false);
     }
-}))
\ No newline at end of file
+}), persistOptions('posts', {
+    // Only the newest page and its counts are kept, so the snapshot stays small.
+    partialize: (state) => {
+        const postIndex = takeItems(state.postIndex, FEED_PAGE_SIZE);
+        const engagement = {};
+        postIndex.ids.forEach((id) => {
+            if (state.engagement[id]) engagement[id] = state.engagement[id];
+        });
+        return {postIndex, engagement};
+    },
+    merge: (persisted, current) => ({
+        ...current,
+        ...persisted,
+        ...withPostIndex(persisted?.postIndex || current.postIndex)
+    })
+})))
+
+resetOnSignOut(usePostStore, () => {
+    usePostStore.getState().stopPostsListener();
+    pendingEngagement.clear();
+    loadedEngagement.clear();
+});
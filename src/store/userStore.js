@@ -1,19 +1,38 @@
-import { arrayUnion, doc, getDoc, setDoc, updateDoc } from 'firebase/firestore';
+import { arrayUnion, doc, updateDoc } from 'firebase/firestore';
 import {create} from 'zustand';
+import { persist } from 'zustand/middleware';
 import { auth, db } from '../services/firebase';
+import { measureWrite } from '../services/instrumentation';
+import { commitWrites } from '../services/mutations';
+import { clearProfile, loadProfile, primeProfile } from '../services/profileLoader';
+import { affectsSearchIndex, userSearchWrite } from '../services/userSearch';
+import { persistOptions, resetOnSignOut } from '../services/persistence';
 import { updateProfile } from 'firebase/auth';
 
-export const useProfileStore = create((set) => ({
+// The signed-in user's profile is kept apart from the one being viewed, so visiting
+// another profile doesn't replace the copy Home renders from on the next start.
+const ownProfileUpdate = (profile) => (
+  profile && profile.id === auth.currentUser?.uid ? { ownProfile: profile } : {}
+);
+
+export const useProfileStore = create(persist((set, get) => ({
   profile: null,
+  ownProfile: null,
   isLoading: false,
   error: null,
 
   fetchProfile: async (userId) => {
     console.log('fetchProfile userId', userId)
-    set({ isLoading: true });
+    // A restored copy of the same profile renders immediately and is refreshed in place.
+    const { profile: current, ownProfile } = get();
+    if (current?.id !== userId && ownProfile?.id === userId) {
+      set({ profile: ownProfile, isLoading: false });
+    } else {
+      set({ isLoading: current?.id !== userId });
+    }
     try {
-      const docRef = await getDoc(doc(db, 'users', userId));
-      set({ profile: docRef.data(), isLoading: false });
+      const profile = await loadProfile(userId);
+      set({ profile, ...ownProfileUpdate(profile), isLoading: false });
     } catch (error) {
       console.error('Profile fetch error:', error);
       set({ error: error.response?.data?.detail || error.message || 'An unknown error occurred', isLoading: false });
@@ -23,17 +42,24 @@ export const useProfileStore = create((set) => ({
   updateProfile: async (userId, data) => {
     set({ isLoading: true });
     try {
-      await updateDoc(doc(db, 'users', userId), data);
+      const writes = [(batch) => batch.update(doc(db, 'users', userId), data)];
+      if (affectsSearchIndex(data)) {
+        const current = get().profile?.id === userId ? get().profile : await loadProfile(userId);
+        writes.push(userSearchWrite(userId, { ...current, ...data }));
+      }
+      await commitWrites(writes, 'users.update');
       if (auth.currentUser) {
         await updateProfile(auth.currentUser, {
             displayName: data.username,
             photoURL: data.profile_picture,
         });
       }
-      set((state) => ({
-        profile: state.profile ? { ...state.profile, ...data } : null,
-        isLoading: false,
-      }));
+      set((state) => {
+        const profile = state.profile ? { ...state.profile, ...data } : null;
+        if (profile) primeProfile(userId, profile);
+        const ownProfile = state.ownProfile?.id === userId ? { ...state.ownProfile, ...data } : state.ownProfile;
+        return { profile, ownProfile, isLoading: false };
+      });
     } catch (error) {
       console.error('Profile update error:', error);
       set({ error: error.message, isLoading: false });
@@ -43,8 +69,13 @@ export const useProfileStore = create((set) => ({
   createProfile: async (userId, data) => {
     set ({isLoading: true});
     try {
-      await setDoc(doc(db, 'users', userId), data);
-      set({ profile: {...data}, isLoading: false });
+      await commitWrites([
+        (batch) => batch.set(doc(db, 'users', userId), data),
+        userSearchWrite(userId, data),
+      ], 'users.create');
+      primeProfile(userId, data);
+      const profile = { id: userId, ...data };
+      set({ profile, ...ownProfileUpdate(profile), isLoading: false });
     } catch (error) {
       set({ error: error.message, isLoading: false });
     }
@@ -52,7 +83,9 @@ export const useProfileStore = create((set) => ({
 
   followUser: async (userId) => {
     try {
-      await updateDoc(doc(db, 'users', userId), { followers: arrayUnion(auth.currentUser.uid) });
+      await measureWrite('users.follow', updateDoc(doc(db, 'users', userId), { followers: arrayUnion(auth.currentUser.uid) }));
+      // The cached copy has the old followers; the next load reads the server's merged array.
+      clearProfile(userId);
       set((state) => ({
         profile: state.profile
           ? { ...state.profile, followers_count: state.profile.followers_count + 1 }
@@ -62,4 +95,8 @@ export const useProfileStore = create((set) => ({
       set({ error: error.response.data });
     }
   },
-}));
\ No newline at end of file
+}), persistOptions('profile', {
+  partialize: (state) => ({ ownProfile: state.ownProfile }),
+})));
+
+resetOnSignOut(useProfileStore);
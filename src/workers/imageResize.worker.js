@@ -0,0 +1,11 @@
+/* eslint-disable no-restricted-globals */
+import { encodeImageVariants } from '../services/imageEncoding';
+
+self.onmessage = async ({ data: { id, file } }) => {
+    try {
+        const { image, thumbnail } = await encodeImageVariants(file);
+        self.postMessage({ id, image, thumbnail });
+    } catch (error) {
+        self.postMessage({ id, error: error.message });
+    }
+};